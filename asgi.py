@@ -0,0 +1,150 @@
+"""ASGI entry point, the async serving mode.
+
+The menu and checkout routes below run as coroutines on SQLAlchemy's asyncio
+engine (asyncpg, or aiosqlite for SQLite), so a request waiting on the
+database holds no thread. They build their responses with the queries of
+app.py through AsyncSession.run_sync(). Every other route is handed to the
+Flask app, which runs in a thread pool.
+
+    uvicorn asgi:application --workers 4
+"""
+import json
+import re
+from os import environ
+
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from blueprints.menu import all_menu, available_menu, menu_details
+from blueprints.order import place_order
+from db_config import (
+    async_database_uri,
+    async_engine_options,
+    set_transaction_timeout,
+)
+from extensions import menu_cache
+from wsgi import app
+
+engine = create_async_engine(
+    async_database_uri(app.config["SQLALCHEMY_DATABASE_URI"]),
+    **async_engine_options(environ, app.config["SQLALCHEMY_DATABASE_URI"]),
+)
+if app.config["DB_PGBOUNCER"] and app.config["DB_STATEMENT_TIMEOUT"]:
+    set_transaction_timeout(engine.sync_engine, app.config["DB_STATEMENT_TIMEOUT"])
+Session = async_sessionmaker(engine, expire_on_commit=False)
+flask_app = WsgiToAsgi(app)
+
+
+def encode(payload):
+    return app.json.dumps(payload).encode("utf-8")
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+def etag_matches(scope, etag):
+    # the If-None-Match header holds "*" or a list of (weak) etags
+    for name, value in scope["headers"]:
+        if name == b"if-none-match":
+            for tag in value.decode("latin-1").split(","):
+                tag = tag.strip()
+                if tag.startswith("W/"):
+                    tag = tag[2:]
+                if tag == "*" or tag.strip('"') == etag:
+                    return True
+    return False
+
+
+# menu_cache_response() of the menu blueprint for coroutines, sharing its cache
+async def cached_menu(scope, key, build, *args):
+    enabled = app.config["MENU_CACHE_ENABLED"]
+    entry = menu_cache.get(key) if enabled else None
+    if entry is None:
+        generation = menu_cache.generation
+        async with Session() as session:
+            payload = await session.run_sync(build, *args)
+        if payload is None:
+            body = encode({"success": False, "message": "Data not found", "data": {}})
+            return 404, body, []
+        if not enabled:
+            return 200, encode(payload), []
+        entry = menu_cache.set(key, encode(payload), generation)
+    etag, body = entry
+    headers = [(b"etag", f'"{etag}"'.encode())]
+    if etag_matches(scope, etag):
+        return 304, b"", headers
+    return 200, body, headers
+
+
+async def get_available_menu(scope, receive):
+    return await cached_menu(scope, "available", available_menu)
+
+
+async def get_all_menu(scope, receive):
+    return await cached_menu(scope, "all", all_menu)
+
+
+async def get_menu(scope, receive, m_id):
+    m_id = int(m_id)
+    return await cached_menu(scope, f"menu:{m_id}", menu_details, m_id)
+
+
+async def create_order(scope, receive):
+    try:
+        data = json.loads(await read_body(receive))
+        items, email = data["order_items"], data["user_data"]["email"]
+    except (ValueError, TypeError, KeyError):
+        body = encode({"success": False, "message": "Invalid order", "data": {}})
+        return 400, body, []
+    async with Session() as session:
+        payload, status = await session.run_sync(place_order, items, email)
+    return status, encode(payload), []
+
+
+ROUTES = [
+    ("GET", re.compile(r"/menu/available"), get_available_menu),
+    ("GET", re.compile(r"/menu/all"), get_all_menu),
+    ("GET", re.compile(r"/menu/(?P<m_id>\d+)"), get_menu),
+    ("POST", re.compile(r"/order/create"), create_order),
+]
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await engine.dispose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http":
+        for method, path, handler in ROUTES:
+            match = path.fullmatch(scope["path"])
+            if match and scope["method"] == method:
+                # for the services (menu_cache, order_queue, ...) of the app
+                with app.app_context():
+                    status, body, headers = await handler(
+                        scope, receive, **match.groupdict()
+                    )
+                headers.append((b"content-type", b"application/json"))
+                # what flask-cors adds to the Flask responses
+                if any(name == b"origin" for name, _ in scope["headers"]):
+                    headers.append((b"access-control-allow-origin", b"*"))
+                await send(
+                    {"type": "http.response.start", "status": status, "headers": headers}
+                )
+                await send({"type": "http.response.body", "body": body})
+                return
+    await flask_app(scope, receive, send)
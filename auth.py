@@ -0,0 +1,109 @@
+from flask import current_app
+from flask_httpauth import HTTPBasicAuth, HTTPTokenAuth, MultiAuth
+from itsdangerous import BadSignature, SignatureExpired
+
+from extensions import credential_cache, db, password_hasher, token_serializer
+from models import User
+
+basic_auth = HTTPBasicAuth()
+token_auth = HTTPTokenAuth(scheme="Bearer")
+auth = MultiAuth(basic_auth, token_auth)
+
+
+# Identity carried by a bearer token, the user row is only loaded on demand
+class TokenUser:
+    def __init__(self, id, email, role):
+        self.id = id
+        self.email = email
+        self.role = role
+
+    def __getattr__(self, name):
+        # other columns (name, balance, ...) come from the user row
+        user = db.session.get(User, self.id)
+        return getattr(user, name)
+
+    def __repr__(self):
+        return f"<TokenUser {self.id}>"
+
+
+def issue_token(user):
+    return token_serializer.dumps(
+        {"id": user.id, "email": user.email, "role": user.role}
+    )
+
+
+# Authentication
+@basic_auth.verify_password
+def verify_password(username, password):
+    # credential already verified recently, skip bcrypt
+    if current_app.config["AUTH_CACHE_ENABLED"]:
+        cached = credential_cache.get(username, password)
+        if cached:
+            user_id, password_hash = cached
+            user = db.session.get(User, user_id)
+            if user and user.email == username and user.password == password_hash:
+                return user
+            credential_cache.invalidate(username)
+
+    user = User.query.filter_by(email=username).first()
+
+    # user with that email not found, call Error Auth Handler
+    if not user:
+        return False
+
+    # check password
+    is_valid = password_hasher.check(user.password, password)
+
+    # password correct, call Authorization
+    if is_valid:
+        rehash_password(user, password)
+        if current_app.config["AUTH_CACHE_ENABLED"]:
+            credential_cache.set(username, password, user.id, user.password)
+        return user
+
+    # password incorrect, call Error Auth Handler
+    else:
+        return False
+
+
+# store the hash again when it was made with another PASSWORD_HASH_ROUNDS
+def rehash_password(user, password):
+    if password_hasher.needs_rehash(user.password):
+        user.password = password_hasher.hash(password)
+        db.session.commit()
+
+
+@token_auth.verify_token
+def verify_token(token):
+    if not current_app.config["AUTH_TOKEN_ENABLED"]:
+        return False
+
+    # signature and expiry are checked without touching the database
+    try:
+        payload = token_serializer.loads(token, max_age=current_app.config["AUTH_TOKEN_TTL"])
+    except (SignatureExpired, BadSignature):
+        return False
+    return TokenUser(payload["id"], payload["email"], payload["role"])
+
+
+# Authorization
+@basic_auth.get_user_roles
+@token_auth.get_user_roles
+def get_user_roles(user):
+    roles = user.role
+    return roles
+
+
+# Auth Error Handler
+def error_handlers(code):
+    # handle if user not exists or incorrect password
+    if code == 401:
+        return {"success": False, "message": "Unauthorized", "data": {}}, code
+
+    # handle if user with specified role has no right to access
+    elif code == 403:
+        return {"success": False, "message": "Forbidden", "data": {}}, code
+
+
+basic_auth.error_handler(error_handlers)
+token_auth.error_handler(error_handlers)
@@ -0,0 +1,81 @@
+"""Throughput of the sync (WSGI) and async (ASGI) serving modes.
+
+Both servers are started with one worker process on the configured
+database (gunicorn with WEB_THREADS threads, uvicorn), then --connections
+keep-alive clients load the menu routes and checkout for --seconds at each
+concurrency level. Set MENU_CACHE_ENABLED=false to measure the menu
+queries rather than the cache.
+
+    python -m benchmarks.async_mode --connections 10 50 100 --seconds 10
+"""
+import argparse
+
+from benchmarks.dataset import remove, seed
+from benchmarks.load import HttpClient, browse_all, browse_available, browse_menu
+from benchmarks.load import free_port, run, start_server, totals
+
+
+def order(client, dataset, rng):
+    client.request(
+        "POST /order/create", "POST", "/order/create",
+        {"order_items": [{"menu_id": rng.choice(dataset.menu_ids), "quantity": 1}],
+         "user_data": {"email": rng.choice(dataset.member_emails)}},
+    )
+
+
+WORKLOADS = {
+    "menu": {browse_available: 2, browse_all: 1, browse_menu: 2},
+    "checkout": {order: 1},
+}
+
+# command line of each server listening on a port
+SERVERS = {
+    "sync": lambda port: [
+        "-m", "gunicorn", "wsgi:app", "--workers", "1", "--bind", f"127.0.0.1:{port}"
+    ],
+    "async": lambda port: [
+        "-m", "uvicorn", "asgi:application", "--log-level", "warning",
+        "--port", str(port),
+    ],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--modes", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--menus", type=int, default=100)
+    args = parser.parse_args()
+
+    dataset = seed(args.users, args.menus, orders=0)
+    print(f"{'mode':<7}{'workload':<10}{'conns':>6}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    try:
+        for mode in args.modes:
+            port = free_port()
+            server = start_server(SERVERS[mode](port), port)
+            url = f"http://127.0.0.1:{port}"
+            try:
+                for workload, mix in WORKLOADS.items():
+                    for connections in args.connections:
+                        recorder = run(
+                            lambda recorder: HttpClient(recorder, url),
+                            dataset, mix, connections, args.seconds, 0,
+                        )
+                        result = totals(recorder, args.seconds)
+                        print(
+                            f"{mode:<7}{workload:<10}{connections:>6}"
+                            f"{result['throughput']:>10.1f}{result['p50_ms']:>10.2f}"
+                            f"{result['p95_ms']:>10.2f}{result['errors']:>8}"
+                        )
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        remove(dataset.tag)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Requests per second of admin endpoints with the credential cache on and off.
+
+Run from the repository root against the configured database:
+
+    python -m benchmarks.auth_cache --requests 200
+"""
+import argparse
+import time
+from base64 import b64encode
+from uuid import uuid4
+
+from extensions import db, password_hasher
+from models import User
+from wsgi import app
+
+PATHS = ["/orders/created", "/balance/topup"]
+
+
+def requests_per_second(client, path, headers, total):
+    start = time.perf_counter()
+    for _ in range(total):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.status_code
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    email = f"bench-{uuid4().hex[:8]}@example.com"
+    password = "bench-password"
+    token = b64encode(f"{email}:{password}".encode()).decode()
+    headers = {"Authorization": f"Basic {token}"}
+
+    with app.app_context():
+        admin = User(
+            name="Benchmark Admin",
+            email=email,
+            password=password_hasher.hash(password),
+            role="admin",
+        )
+        db.session.add(admin)
+        db.session.commit()
+
+    client = app.test_client()
+    try:
+        for enabled in (False, True):
+            app.config["AUTH_CACHE_ENABLED"] = enabled
+            app.extensions["coffeeshop"].credential_cache.clear()
+            for path in PATHS:
+                rps = requests_per_second(client, path, headers, args.requests)
+                state = "on" if enabled else "off"
+                print(f"cache {state:<3} {path:<18} {rps:10.1f} req/s")
+    finally:
+        with app.app_context():
+            User.query.filter_by(email=email).delete()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
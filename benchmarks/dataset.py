@@ -0,0 +1,232 @@
+"""Synthetic coffee shop data for the benchmarks, built from sample_data.py.
+
+seed() inserts members, menus, a history of completed orders and pending
+top-ups, all marked with a tag so remove() can take them out again. The
+same arguments and --seed always give the same data.
+
+    python -m benchmarks.dataset --users 1000 --menus 500 --orders 20000
+    python -m benchmarks.dataset --remove <tag>
+"""
+import argparse
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from sample_data import menus
+
+ADJECTIVES = ["Iced", "Double", "Vanilla", "Caramel", "Honey", "Hazelnut",
+              "Spiced", "Small", "Large", "House", "Signature", "Classic"]
+
+PASSWORD = "secret"
+# enough for every checkout of a long run, fits Menu.stock (SMALLINT)
+STOCK = 30000
+BALANCE = 10**9
+# orders are spread over this many days before now
+HISTORY_DAYS = 90
+BATCH = 1000
+
+
+@dataclass
+class Dataset:
+    tag: str
+    password: str
+    admin_email: str
+    member_ids: list = field(default_factory=list)
+    member_emails: list = field(default_factory=list)
+    menu_ids: list = field(default_factory=list)
+
+
+def synthetic_menus(count, tag="", seed=42):
+    rng = random.Random(seed)
+    for n in range(count):
+        base = menus[n % len(menus)]
+        yield {
+            "name": f"{rng.choice(ADJECTIVES)} {base['name']} {tag}{n}",
+            "desc": base["desc"],
+            "price": base["price"],
+            "stock": rng.randint(0, 30),
+            "img_url": base["img_url"],
+            "category": base["category"],
+        }
+
+
+def batches(rows):
+    for start in range(0, len(rows), BATCH):
+        yield rows[start : start + BATCH]
+
+
+def insert_rows(session, model, rows):
+    # ids of the inserted rows, in the order of `rows`
+    ids = []
+    for batch in batches(rows):
+        result = session.execute(
+            model.__table__.insert().returning(
+                model.__table__.c.id, sort_by_parameter_order=True
+            ),
+            batch,
+        )
+        ids += result.scalars().all()
+    return ids
+
+
+def seed(users=100, menu_count=50, orders=1000, topups=0, seed=42, tag=None):
+    from extensions import db, password_hasher
+    from leaderboard import rebuild_leaderboard
+    from models import Balance_Record, Menu, Order, Order_Items, User
+    from wsgi import app
+
+    rng = random.Random(seed)
+    tag = tag or f"bench{uuid4().hex[:6]}"
+    dataset = Dataset(
+        tag=tag, password=PASSWORD, admin_email=f"{tag}-admin@example.com"
+    )
+    now = datetime.now()
+
+    with app.app_context():
+        session = db.session
+        # one hash for everyone, hashing each user would dominate seeding
+        password = password_hasher.hash(PASSWORD)
+        session.execute(
+            User.__table__.insert(),
+            [{"name": f"Admin {tag}", "email": dataset.admin_email,
+              "password": password, "balance": 0, "role": "admin"}],
+        )
+        dataset.member_emails = [f"{tag}-{n}@example.com" for n in range(users)]
+        dataset.member_ids = insert_rows(session, User, [
+            {"name": f"Member {tag} {n}", "email": email, "password": password,
+             "balance": 0, "role": "member"}
+            for n, email in enumerate(dataset.member_emails)
+        ])
+
+        catalogue = list(synthetic_menus(menu_count, f"{tag}-", seed))
+        for menu in catalogue:
+            menu["stock"] = STOCK
+        dataset.menu_ids = insert_rows(session, Menu, catalogue)
+
+        # completed orders, paid from a completed top-up of BALANCE
+        history = []
+        for _ in range(orders):
+            lines = rng.sample(range(menu_count), min(menu_count, rng.randint(1, 3)))
+            items = [(n, rng.randint(1, 3)) for n in lines]
+            created = now - timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 86400))
+            history.append((rng.randrange(users), created, items))
+        order_ids = insert_rows(session, Order, [
+            {"user_id": dataset.member_ids[member],
+             "customer_name": f"Member {tag} {member}",
+             "total_bill": sum(catalogue[n]["price"] * qty for n, qty in items),
+             "status": "completed",
+             "created_date": created,
+             "completed_date": created + timedelta(minutes=10)}
+            for member, created, items in history
+        ])
+        item_rows = [
+            {"order_id": order_id, "menu_id": dataset.menu_ids[n],
+             "menu_name": catalogue[n]["name"], "quantity": qty}
+            for order_id, (_, _, items) in zip(order_ids, history)
+            for n, qty in items
+        ]
+        spent = [0] * users
+        record_rows = []
+        for order_id, (member, created, items) in zip(order_ids, history):
+            bill = sum(catalogue[n]["price"] * qty for n, qty in items)
+            spent[member] += bill
+            record_rows.append(
+                {"user_id": dataset.member_ids[member],
+                 "member_name": f"Member {tag} {member}", "order_id": order_id,
+                 "nominal": bill, "completed_date": created,
+                 "status": "completed", "type": "payment"}
+            )
+        for member, user_id in enumerate(dataset.member_ids):
+            record_rows.append(
+                {"user_id": user_id, "member_name": f"Member {tag} {member}",
+                 "order_id": None, "nominal": BALANCE + spent[member],
+                 "created_date": now - timedelta(days=HISTORY_DAYS + 1),
+                 "completed_date": now - timedelta(days=HISTORY_DAYS + 1),
+                 "status": "completed", "type": "topup"}
+            )
+        for n in range(topups):
+            member = rng.randrange(users)
+            record_rows.append(
+                {"user_id": dataset.member_ids[member],
+                 "member_name": f"Member {tag} {member}", "order_id": None,
+                 "nominal": rng.choice([10000, 25000, 50000, 100000]),
+                 "created_date": now - timedelta(seconds=topups - n),
+                 "completed_date": None, "status": "created", "type": "topup"}
+            )
+        for batch in batches(item_rows):
+            session.execute(Order_Items.__table__.insert(), batch)
+        for batch in batches(record_rows):
+            session.execute(Balance_Record.__table__.insert(), batch)
+
+        # balances match the records, so `flask ledger reconcile` stays clean
+        session.execute(
+            User.__table__.update()
+            .where(User.id.in_(dataset.member_ids))
+            .values(balance=BALANCE)
+        )
+        session.commit()
+        rebuild_leaderboard()
+    return dataset
+
+
+def remove(tag):
+    from extensions import db, menu_cache
+    from leaderboard import rebuild_leaderboard
+    from models import Balance_Record, Cart_Items, Menu, Order, Order_Items, User
+    from wsgi import app
+
+    with app.app_context():
+        session = db.session
+        user_ids = select_ids(session, User.id, User.email.like(f"{tag}-%"))
+        menu_ids = select_ids(session, Menu.id, Menu.name.like(f"% {tag}-%"))
+        order_ids = select_ids(session, Order.id, Order.user_id.in_(user_ids))
+        for statement in [
+            Cart_Items.__table__.delete().where(
+                Cart_Items.user_id.in_(user_ids) | Cart_Items.menu_id.in_(menu_ids)
+            ),
+            Balance_Record.__table__.delete().where(
+                Balance_Record.user_id.in_(user_ids)
+            ),
+            Order_Items.__table__.delete().where(
+                Order_Items.order_id.in_(order_ids) | Order_Items.menu_id.in_(menu_ids)
+            ),
+            Order.__table__.delete().where(Order.id.in_(order_ids)),
+            Menu.__table__.delete().where(Menu.id.in_(menu_ids)),
+            User.__table__.delete().where(User.id.in_(user_ids)),
+        ]:
+            session.execute(statement)
+        session.commit()
+        # drops the stats rows of the removed menus and members
+        rebuild_leaderboard()
+        menu_cache.invalidate()
+    return len(user_ids), len(menu_ids), len(order_ids)
+
+
+def select_ids(session, column, condition):
+    return session.execute(select(column).where(condition)).scalars().all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--menus", type=int, default=50)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--topups", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--remove", metavar="TAG")
+    args = parser.parse_args()
+
+    if args.remove:
+        users, menu_count, orders = remove(args.remove)
+        print(f"removed {users} users, {menu_count} menus, {orders} orders")
+        return
+    dataset = seed(args.users, args.menus, args.orders, args.topups, args.seed)
+    print(f"tag {dataset.tag}, admin {dataset.admin_email}, password {dataset.password}")
+    print(f"remove with: python -m benchmarks.dataset --remove {dataset.tag}")
+
+
+if __name__ == "__main__":
+    main()
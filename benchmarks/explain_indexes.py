@@ -0,0 +1,142 @@
+"""Check that the SQL issued by the order and top-up routes can be served from indexes.
+
+Every SELECT a route runs is captured and re-run under EXPLAIN. On Postgres
+sequential scans are disabled first, so a remaining "Seq Scan" means no index
+can serve the query. Exits non-zero when a checked table is scanned.
+
+    python -m benchmarks.explain_indexes
+"""
+import re
+import sys
+from base64 import b64encode
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from extensions import db, password_hasher
+from models import (
+    Balance_Record,
+    Menu,
+    Menu_Stats,
+    Order,
+    Order_Items,
+    User,
+    User_Stats,
+)
+from wsgi import app
+
+CHECKED_TABLES = ["order", "order_items", "balance_record", "user"]
+
+
+def full_scans(connection, statement, parameters):
+    # names of checked tables read without an index
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+        plan = "\n".join(row[0] for row in rows)
+        scanned = re.findall(r'Seq Scan on "?(\w+)"?', plan)
+    else:
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        plan = "\n".join(row[-1] for row in rows)
+        scanned = [
+            table
+            for table, rest in re.findall(r'SCAN "?(\w+)"?(.*)', plan)
+            if "USING" not in rest
+        ]
+    return [table for table in scanned if table in CHECKED_TABLES], plan
+
+
+def main():
+    tag = uuid4().hex[:8]
+    password = "bench-password"
+    with app.app_context():
+        hashed = password_hasher.hash(password)
+        admin = User(
+            name="Benchmark Admin",
+            email=f"bench-admin-{tag}@example.com",
+            password=hashed,
+            role="admin",
+        )
+        member = User(
+            name="Benchmark Member",
+            email=f"bench-member-{tag}@example.com",
+            password=hashed,
+            balance=10**9,
+            role="member",
+        )
+        menu = Menu(
+            name=f"Benchmark {tag}",
+            desc="-",
+            price=1,
+            stock=10,
+            img_url="-",
+            category="drinks",
+        )
+        db.session.add_all([admin, member, menu])
+        db.session.commit()
+        admin_email, member_email = admin.email, member.email
+        user_ids, menu_id = [admin.id, member.id], menu.id
+
+    def basic(email):
+        token = b64encode(f"{email}:{password}".encode()).decode()
+        return {"Authorization": f"Basic {token}"}
+
+    client = app.test_client()
+    order_id = client.post(
+        "/order/create",
+        json={
+            "order_items": [{"menu_id": menu_id, "quantity": 1}],
+            "user_data": {"email": member_email},
+        },
+    ).json["data"]["order_id"]
+    routes = [
+        ("/orders/created", basic(admin_email)),
+        ("/orders/created?status=in-process", basic(admin_email)),
+        ("/orders/created?status=waiting-list", basic(admin_email)),
+        (f"/order/details/{order_id}", basic(member_email)),
+        ("/orders/all", None),
+        ("/balance/topup", basic(admin_email)),
+    ]
+
+    failures = 0
+    try:
+        with app.app_context():
+            for path, headers in routes:
+                statements = []
+
+                def capture(conn, cursor, statement, parameters, context, executemany):
+                    if statement.lstrip().upper().startswith("SELECT"):
+                        statements.append((statement, parameters))
+
+                event.listen(db.engine, "before_cursor_execute", capture)
+                try:
+                    assert client.get(path, headers=headers).status_code == 200, path
+                finally:
+                    event.remove(db.engine, "before_cursor_execute", capture)
+
+                with db.engine.connect() as connection:
+                    for statement, parameters in statements:
+                        scanned, plan = full_scans(connection, statement, parameters)
+                        status = "ok  " if not scanned else "SCAN"
+                        print(f"{status} {path:<38} {' '.join(statement.split())[:80]}")
+                        if scanned:
+                            failures += 1
+                            print("     " + plan.replace("\n", "\n     "))
+                    connection.rollback()
+    finally:
+        with app.app_context():
+            Balance_Record.query.filter(Balance_Record.user_id.in_(user_ids)).delete()
+            Order_Items.query.filter_by(order_id=order_id).delete()
+            Order.query.filter_by(id=order_id).delete()
+            User_Stats.query.filter(User_Stats.user_id.in_(user_ids)).delete()
+            Menu_Stats.query.filter_by(menu_id=menu_id).delete()
+            User.query.filter(User.id.in_(user_ids)).delete()
+            Menu.query.filter_by(id=menu_id).delete()
+            db.session.commit()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Startup time of the app: `import app`, create_app() and the slowest imports.
+
+Every run starts a fresh interpreter that imports the app module and calls
+create_app() on an in-memory SQLite database, so no database or environment
+is needed. The medians of --runs are compared with the budgets, the exit
+status is 1 when either is exceeded. The packages whose imports cost the
+most are listed from one more run under `python -X importtime`.
+
+    python -m benchmarks.import_time --runs 10 --budget-ms 800
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "PASSWORD_HASH_WORKERS": 0})
+created = time.perf_counter()
+print(imported - start, created - imported)
+"""
+
+
+def startup(importtime=False):
+    # seconds of `import app` and of create_app(), and the -X importtime lines
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", SCRIPT]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    imported, created = map(float, result.stdout.split())
+    return imported, created, result.stderr.splitlines()
+
+
+def package_times(lines):
+    # microseconds spent importing the modules of each top-level package
+    totals = defaultdict(int)
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            totals[name.strip().split(".")[0]] += int(own)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--import-budget-ms", type=float, default=50, help="budget of `import app`"
+    )
+    parser.add_argument(
+        "--budget-ms", type=float, default=800, help="budget of import plus create_app()"
+    )
+    args = parser.parse_args()
+
+    imports, totals = [], []
+    for _ in range(args.runs):
+        imported, created, _ = startup()
+        imports.append(imported * 1000)
+        totals.append((imported + created) * 1000)
+    _, _, lines = startup(importtime=True)
+
+    print(f"{'package':<24}{'import ms':>10}")
+    packages = package_times(lines)
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{name:<24}{micros / 1000:>10.1f}")
+
+    import_ms = statistics.median(imports)
+    total_ms = statistics.median(totals)
+    print(f"\nmedian of {args.runs} runs")
+    print(f"import app              {import_ms:8.1f} ms  (budget {args.import_budget_ms:g})")
+    print(f"import + create_app()   {total_ms:8.1f} ms  (budget {args.budget_ms:g})")
+    if import_ms > args.import_budget_ms or total_ms > args.budget_ms:
+        print("over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
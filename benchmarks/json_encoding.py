@@ -0,0 +1,109 @@
+"""Encoding throughput of the JSON providers on a 10k-order payload.
+
+--orders rows of the /orders/all query are selected from an in-memory
+SQLite database, turned into the response list as the route did
+(Row._asdict()) and as schemas.OrderRow records, and the page is encoded
+by Flask's default provider and by FastJSONProvider with each available
+encoder and date format. Medians of --repeat runs; the configured database
+is not used.
+
+    python -m benchmarks.json_encoding --orders 10000 --repeat 20
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import create_engine, insert, select
+
+from json_provider import FastJSONProvider, orjson
+from models import Order
+from schemas import OrderRow, columns, records
+
+
+def order_rows(count, seed=42):
+    engine = create_engine("sqlite://")
+    Order.__table__.create(engine)
+    rng = random.Random(seed)
+    start = datetime(2023, 6, 1, 8, 0, 0)
+    with engine.begin() as connection:
+        connection.execute(insert(Order), [
+            {"customer_name": f"Member {rng.randrange(1000)}",
+             "total_bill": rng.randint(1, 20) * 5000,
+             "status": rng.choice(["completed", "in-process", "cancelled"]),
+             "created_date": start + timedelta(
+                 seconds=n * 7, microseconds=rng.randrange(10**6)
+             )}
+            for n in range(count)
+        ])
+        return connection.execute(
+            select(*columns(OrderRow, Order)).order_by(Order.created_date.desc())
+        ).all()
+
+
+def page(order_list):
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"order_list": order_list, "next_cursor": None},
+    }
+
+
+def providers(app):
+    yield "flask default", DefaultJSONProvider(app)
+    encoders = ["json"] + (["orjson"] if orjson is not None else [])
+    for encoder in encoders:
+        for datetime_format in ("http", "iso"):
+            yield f"{encoder} {datetime_format}", FastJSONProvider(
+                app, encoder, datetime_format
+            )
+
+
+def median_seconds(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = order_rows(args.orders)
+    shapes = {
+        "dicts": lambda: [row._asdict() for row in rows],
+        "records": lambda: records(OrderRow, rows),
+    }
+    documents, build = {}, {}
+    for shape, convert in shapes.items():
+        build[shape], order_list = median_seconds(convert, args.repeat)
+        documents[shape] = page(order_list)
+    app = Flask(__name__)
+
+    print(f"{args.orders} orders, median of {args.repeat}")
+    print(f"{'provider':<16}{'built as':<10}{'build ms':>10}{'encode ms':>11}"
+          f"{'total ms':>10}{'MB/s':>8}{'KB':>7}")
+    for name, provider in providers(app):
+        for shape, document in documents.items():
+            if name == "flask default" and shape == "records":
+                # dataclasses.asdict() per record, not a path worth timing
+                continue
+            seconds, body = median_seconds(lambda: provider.dumps(document), args.repeat)
+            size = len(body.encode("utf-8"))
+            print(
+                f"{name:<16}{shape:<10}{build[shape] * 1000:>10.2f}"
+                f"{seconds * 1000:>11.2f}{(build[shape] + seconds) * 1000:>10.2f}"
+                f"{size / seconds / 1e6:>8.1f}{size / 1024:>7.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
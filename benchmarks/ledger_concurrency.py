@@ -0,0 +1,148 @@
+"""Parallel top-up approvals and payments for one member, checks the ledger.
+
+Every top-up is approved twice at the same time and payments race the
+approvals. Afterwards the balance must equal the completed balance records,
+never be negative, and each top-up must have been credited once.
+
+Run from the repository root against the configured database:
+
+    python -m benchmarks.ledger_concurrency --topups 50 --payments 100
+"""
+import argparse
+import random
+import sys
+import time
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from uuid import uuid4
+
+from extensions import db, password_hasher
+from models import Balance_Record, Menu, Order, Order_Items, User, ledger
+from wsgi import app
+
+TOPUP = 10000
+
+
+def approve(record_id, headers):
+    client = app.test_client()
+    return client.put(f"/balance/topup/{record_id}", headers=headers).status_code
+
+
+def pay(email, menu_id):
+    client = app.test_client()
+    response = client.post(
+        "/order/create",
+        json={
+            "order_items": [{"menu_id": menu_id, "quantity": 1}],
+            "user_data": {"email": email},
+        },
+    )
+    return response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topups", type=int, default=50)
+    parser.add_argument("--payments", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    tag = uuid4().hex[:8]
+    email = f"bench-{tag}@example.com"
+    admin_email = f"bench-admin-{tag}@example.com"
+    with app.app_context():
+        member = User(
+            name="Benchmark Member", email=email, password="-", role="member"
+        )
+        admin = User(
+            name="Benchmark Admin",
+            email=admin_email,
+            password=password_hasher.hash("secret"),
+            role="admin",
+        )
+        menu = Menu(
+            name=f"Benchmark {email}",
+            desc="-",
+            price=TOPUP,
+            stock=args.payments,
+            img_url="-",
+            category="drinks",
+        )
+        db.session.add_all([member, admin, menu])
+        db.session.flush()
+        records = [
+            Balance_Record(
+                user_id=member.id,
+                member_name=member.name,
+                nominal=TOPUP,
+                created_date=datetime.now(),
+                status="created",
+                type="topup",
+            )
+            for _ in range(args.topups)
+        ]
+        db.session.add_all(records)
+        db.session.commit()
+        member_id, admin_id, menu_id = member.id, admin.id, menu.id
+        record_ids = [record.id for record in records]
+
+    credentials = b64encode(f"{admin_email}:secret".encode()).decode()
+    headers = {"Authorization": f"Basic {credentials}"}
+    jobs = [("approve", r_id) for r_id in record_ids * 2]
+    jobs += [("pay", None)] * args.payments
+    random.shuffle(jobs)
+
+    def run(job):
+        kind, r_id = job
+        if kind == "approve":
+            return kind, approve(r_id, headers)
+        return kind, pay(email, menu_id)
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            results = list(pool.map(run, jobs))
+        elapsed = time.perf_counter() - start
+
+        approvals = [code for kind, code in results if kind == "approve"]
+        payments = [code for kind, code in results if kind == "pay"]
+        with app.app_context():
+            balance = db.session.get(User, member_id).balance
+            expected = ledger.balances(db.session, [member_id]).get(member_id, 0)
+            completed = Balance_Record.query.filter_by(
+                user_id=member_id, type="topup", status="completed"
+            ).count()
+            paid = Balance_Record.query.filter_by(
+                user_id=member_id, type="payment"
+            ).count()
+
+        print(f"requests            {len(jobs)} in {elapsed:.2f}s")
+        print(f"approvals accepted  {approvals.count(200)} (duplicates rejected {approvals.count(400)})")
+        print(f"payments accepted   {payments.count(201)} (rejected {payments.count(400)})")
+        print(f"other responses     {len(jobs) - approvals.count(200) - approvals.count(400) - payments.count(201) - payments.count(400)}")
+        print(f"balance             {balance}, from records {expected}")
+        consistent = (
+            balance == expected >= 0
+            and completed == approvals.count(200)
+            and paid == payments.count(201)
+            and balance == TOPUP * (completed - paid)
+        )
+        print("ledger is consistent" if consistent else "LEDGER DRIFTED")
+    finally:
+        with app.app_context():
+            order_ids = [o.id for o in Order.query.filter_by(user_id=member_id)]
+            Balance_Record.query.filter_by(user_id=member_id).delete()
+            Order_Items.query.filter(Order_Items.order_id.in_(order_ids)).delete()
+            Order.query.filter_by(user_id=member_id).delete()
+            db.session.delete(db.session.get(Menu, menu_id))
+            db.session.delete(db.session.get(User, member_id))
+            db.session.delete(db.session.get(User, admin_id))
+            db.session.commit()
+
+    if not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Latency and memory of the list endpoints, entity loads vs column projections.
+
+--rows menus, users and orders are inserted into an in-memory SQLite
+database. The response of each list endpoint is built as the routes did,
+from ORM entities read attribute by attribute into dicts, and as they do
+now, selecting only the serialized columns into schemas.py records
+(project / fetch), then encoded by FastJSONProvider. Latency is the
+median of --repeat runs, each in a new session like a request; memory is
+the tracemalloc peak of one more run. The configured database is not used.
+
+    python -m benchmarks.list_queries --rows 100000 --repeat 5
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from functools import partial
+
+from flask import Flask
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from blueprints.menu import all_menu, available_menu
+from json_provider import FastJSONProvider
+from models import Menu, Order, User
+from schemas import OrderRow, StockRow, UserRow, fetch, project
+
+ORDER_PAGE = 1000
+
+
+def seed(engine, count, seed=42):
+    for model in (Menu, User, Order):
+        model.__table__.create(engine)
+    rng = random.Random(seed)
+    start = datetime(2023, 6, 1, 8, 0, 0)
+    with engine.begin() as connection:
+        connection.execute(insert(Menu), [
+            {"name": f"Menu {n}",
+             "desc": f"House blend number {n}, brewed to order.",
+             "price": rng.randint(10, 60) * 1000,
+             "stock": rng.randrange(100),
+             "img_url": f"https://example.com/menu/{n}.jpg",
+             "category": rng.choice(["drinks", "foods"])}
+            for n in range(count)
+        ])
+        connection.execute(insert(User), [
+            {"name": f"Member {n}",
+             "email": f"member{n}@example.com",
+             "password": "$2b$12$" + "x" * 53,
+             "balance": rng.randrange(100) * 5000,
+             "role": "member"}
+            for n in range(count)
+        ])
+        connection.execute(insert(Order), [
+            {"customer_name": f"Member {rng.randrange(count)}",
+             "total_bill": rng.randint(1, 20) * 5000,
+             "status": rng.choice(["completed", "in-process", "cancelled"]),
+             "created_date": start + timedelta(seconds=n * 7)}
+            for n in range(count)
+        ])
+
+
+# the payloads as the routes built them from entities
+
+
+def available_entities(session):
+    def cards(category):
+        return [
+            {"id": menu.id, "img_url": menu.img_url, "name": menu.name,
+             "desc": menu.desc, "price": menu.price, "stock": menu.stock}
+            for menu in session.query(Menu).filter(
+                Menu.category == category, Menu.stock > 0
+            )
+        ]
+
+    return {"success": True, "message": "Data found",
+            "data": {"drinks": cards("drinks"), "foods": cards("foods")}}
+
+
+def all_entities(session):
+    menu_list = [
+        {"id": menu.id, "name": menu.name, "price": menu.price,
+         "stock": menu.stock, "category": menu.category}
+        for menu in session.query(Menu).order_by(Menu.name).all()
+    ]
+    return {"success": True, "message": "Data found", "data": {"menu_list": menu_list}}
+
+
+def orders_entities(session):
+    order_list = [
+        {"created_date": order.created_date, "customer_name": order.customer_name,
+         "id": order.id, "status": order.status, "total_bill": order.total_bill}
+        for order in session.query(Order).order_by(
+            Order.created_date.desc(), Order.id.desc()
+        ).limit(ORDER_PAGE)
+    ]
+    return {"success": True, "message": "Data found", "data": {"order_list": order_list}}
+
+
+def low_stock_entities(session):
+    menu_list = [
+        {"name": item.name, "price": item.price, "stock": item.stock}
+        for item in session.query(Menu).order_by(Menu.stock).limit(5)
+    ]
+    return {"success": True, "message": "Data retrieved", "data": {"menu_list": menu_list}}
+
+
+def users_entities(session):
+    users = [
+        {"name": user.name, "id": user.id, "balance": user.balance,
+         "email": user.email, "role": user.role, "password": user.password}
+        for user in session.query(User).all()
+    ]
+    return {"success": True, "message": "Data found", "data": {"users": users}}
+
+
+# the payloads as the routes build them now
+
+
+def orders_projected(session):
+    query = project(OrderRow, Order).order_by(Order.created_date.desc(), Order.id.desc())
+    order_list = fetch(session, OrderRow, query.limit(ORDER_PAGE))
+    return {"success": True, "message": "Data found", "data": {"order_list": order_list}}
+
+
+def low_stock_projected(session):
+    query = project(StockRow, Menu).order_by(Menu.stock).limit(5)
+    menu_list = fetch(session, StockRow, query)
+    return {"success": True, "message": "Data retrieved", "data": {"menu_list": menu_list}}
+
+
+def users_projected(session):
+    users = fetch(session, UserRow, project(UserRow, User))
+    return {"success": True, "message": "Data found", "data": {"users": users}}
+
+
+ENDPOINTS = {
+    "/menu/available": (available_entities, available_menu),
+    "/menu/all": (all_entities, all_menu),
+    "/orders/all": (orders_entities, orders_projected),
+    "/menu/lowstock": (low_stock_entities, low_stock_projected),
+    "/users/all": (users_entities, users_projected),
+}
+
+
+def respond(engine, provider, build):
+    with Session(engine) as session:
+        return provider.dumps(build(session))
+
+
+def median_ms(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def peak_mb(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    seed(engine, args.rows)
+    provider = FastJSONProvider(Flask(__name__))
+
+    print(f"{args.rows} rows per table, median of {args.repeat}, "
+          f"/orders/all is a page of {ORDER_PAGE}")
+    print(f"{'endpoint':<17}{'entities ms':>12}{'projected ms':>13}{'speedup':>9}"
+          f"{'entities MB':>13}{'projected MB':>14}")
+    for path, (entities, projected) in ENDPOINTS.items():
+        old = partial(respond, engine, provider, entities)
+        new = partial(respond, engine, provider, projected)
+        if old() != new():
+            raise SystemExit(f"{path}: the two responses differ")
+        old_ms, new_ms = median_ms(old, args.repeat), median_ms(new, args.repeat)
+        print(
+            f"{path:<17}{old_ms:>12.1f}{new_ms:>13.1f}{old_ms / new_ms:>8.1f}x"
+            f"{peak_mb(old):>13.2f}{peak_mb(new):>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
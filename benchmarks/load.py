@@ -0,0 +1,407 @@
+"""Mixed traffic load test, throughput and p50/p95/p99 latency per endpoint.
+
+A synthetic dataset is seeded (see benchmarks.dataset), then --clients
+threads send the scenarios of a traffic mix for --seconds, through the
+Flask test client or over HTTP to a running server given by --url (which
+must use the same database). The dataset is removed afterwards.
+
+--save writes the results as JSON, --compare reads such a baseline and
+reports endpoints whose throughput or p95 got worse by more than
+--tolerance percent, exiting with status 1 if any did.
+
+    python -m benchmarks.load --mix mixed --clients 8 --seconds 30 --save baseline.json
+    python -m benchmarks.load --url http://localhost:5000 --compare baseline.json
+"""
+import argparse
+import http.client
+import json
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from base64 import b64encode
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.dataset import remove, seed
+
+SEARCH_TERMS = ["espresso", "latte", "croissant", "iced", "caramel", "matcha",
+                "cake", "tea", "expresso", "bandung"]
+
+
+# scenarios: one user action, made of one or more requests
+def browse_available(client, dataset, rng):
+    client.request("GET /menu/available", "GET", "/menu/available")
+
+
+def browse_all(client, dataset, rng):
+    client.request("GET /menu/all", "GET", "/menu/all")
+
+
+def browse_menu(client, dataset, rng):
+    menu_id = rng.choice(dataset.menu_ids)
+    client.request("GET /menu/<id>", "GET", f"/menu/{menu_id}")
+
+
+def search(client, dataset, rng):
+    query = urlencode({"keyword": rng.choice(SEARCH_TERMS)})
+    client.request("GET /menu/search", "GET", f"/menu/search?{query}")
+
+
+def checkout(client, dataset, rng):
+    member = rng.randrange(len(dataset.member_ids))
+    email = dataset.member_emails[member]
+    headers = basic_auth(email, dataset.password)
+    menu_id = rng.choice(dataset.menu_ids)
+    client.request(
+        "POST /cart/items", "POST", "/cart/items",
+        {"menu_id": menu_id, "quantity": 1}, headers,
+    )
+    status, body = client.request(
+        "POST /order/create", "POST", "/order/create",
+        {"order_items": [{"menu_id": menu_id, "quantity": 1}],
+         "user_data": {"email": email}},
+    )
+    if status == 201:
+        placed.add(body["data"]["order_id"])
+
+
+def admin_queue(client, dataset, rng):
+    headers = basic_auth(dataset.admin_email, dataset.password)
+    client.request(
+        "GET /orders/created", "GET", "/orders/created?status=in-process",
+        headers=headers,
+    )
+    # only orders placed by the checkouts, not whatever else is queued
+    order_id = placed.take()
+    if order_id is not None:
+        client.request(
+            "PUT /order/complete/<id>", "PUT", f"/order/complete/{order_id}",
+            expect=(200, 400),
+        )
+
+
+def topup(client, dataset, rng):
+    email = rng.choice(dataset.member_emails)
+    client.request(
+        "POST /balance/topup", "POST", "/balance/topup",
+        {"nominal": rng.choice([10000, 25000, 50000])},
+        basic_auth(email, dataset.password),
+    )
+
+
+def topup_approval(client, dataset, rng):
+    headers = basic_auth(dataset.admin_email, dataset.password)
+    # the pending top-ups of one seeded member, not of real members
+    query = urlencode({"user_id": rng.choice(dataset.member_ids), "limit": 20})
+    _, body = client.request(
+        "GET /balance/topup", "GET", f"/balance/topup?{query}", headers=headers
+    )
+    records = (body or {}).get("data", {}).get("requests", [])
+    if records:
+        client.request(
+            "PUT /balance/topup", "PUT", "/balance/topup",
+            {"record_ids": [record["record_id"] for record in records]},
+            headers,
+        )
+
+
+# weight of each scenario per traffic mix
+MIXES = {
+    "browse": {browse_available: 4, browse_all: 1, browse_menu: 4, search: 2},
+    "checkout": {browse_menu: 2, checkout: 3},
+    # the checkouts place the orders admin_queue completes
+    "admin": {admin_queue: 3, checkout: 2, topup: 2, topup_approval: 1},
+    "mixed": {
+        browse_available: 30,
+        browse_all: 5,
+        browse_menu: 20,
+        search: 15,
+        checkout: 15,
+        admin_queue: 8,
+        topup: 4,
+        topup_approval: 3,
+    },
+}
+
+
+def basic_auth(email, password):
+    credentials = b64encode(f"{email}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
+
+
+class Recorder:
+    """Latencies and failed requests per endpoint, shared by the clients."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, label, seconds, ok):
+        with self._lock:
+            self.latencies[label].append(seconds)
+            if not ok:
+                self.errors[label] += 1
+
+
+class Placed:
+    """Ids of the orders placed by the checkouts, oldest first."""
+
+    def __init__(self):
+        self._ids = deque()
+        self._lock = threading.Lock()
+
+    def add(self, order_id):
+        with self._lock:
+            self._ids.append(order_id)
+
+    def take(self):
+        with self._lock:
+            return self._ids.popleft() if self._ids else None
+
+
+placed = Placed()
+
+
+class InProcessClient:
+    def __init__(self, recorder):
+        from wsgi import app
+
+        self.client = app.test_client()
+        self.recorder = recorder
+
+    def request(self, label, method, path, body=None, headers=None, expect=None):
+        start = time.perf_counter()
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        self.recorder.add(
+            label, time.perf_counter() - start, succeeded(response.status_code, expect)
+        )
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    # one keep-alive connection per client thread
+    def __init__(self, recorder, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port
+        self.prefix = parts.path.rstrip("/")
+        connection = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.connection = connection(self.host, self.port, timeout=30)
+        self.recorder = recorder
+
+    def request(self, label, method, path, body=None, headers=None, expect=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, payload, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.recorder.add(label, time.perf_counter() - start, False)
+            return None, None
+        self.recorder.add(
+            label, time.perf_counter() - start, succeeded(response.status, expect)
+        )
+        try:
+            return response.status, json.loads(data)
+        except ValueError:
+            return response.status, None
+
+
+def succeeded(status, expect):
+    # a rejected order or top-up is a valid answer, a 5xx is not
+    if expect is not None:
+        return status in expect
+    return status < 500
+
+
+def percentile(ordered, fraction):
+    # nearest rank percentile of a sorted list
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(recorder, seconds):
+    results = {}
+    for label, samples in sorted(recorder.latencies.items()):
+        ordered = sorted(samples)
+        results[label] = {
+            "requests": len(samples),
+            "errors": recorder.errors[label],
+            "throughput": len(samples) / seconds,
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p95_ms": percentile(ordered, 0.95) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+        }
+    return results
+
+
+def totals(recorder, seconds):
+    # all endpoints together
+    ordered = sorted(
+        sample for samples in recorder.latencies.values() for sample in samples
+    )
+    return {
+        "requests": len(ordered),
+        "errors": sum(recorder.errors.values()),
+        "throughput": len(ordered) / seconds,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+    }
+
+
+def report(results):
+    print(f"{'endpoint':<26}{'requests':>9}{'errors':>8}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, row in results.items():
+        print(f"{label:<26}{row['requests']:>9}{row['errors']:>8}"
+              f"{row['throughput']:>10.1f}{row['p50_ms']:>10.2f}"
+              f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}")
+
+
+def compare(results, baseline, tolerance):
+    # endpoints slower than the baseline by more than tolerance percent
+    regressions = []
+    print(f"\n{'endpoint':<26}{'req/s':>16}{'p95 ms':>16}")
+    for label, row in results.items():
+        before = baseline["endpoints"].get(label)
+        if before is None:
+            print(f"{label:<26}{'(new)':>16}")
+            continue
+        throughput = change(before["throughput"], row["throughput"])
+        p95 = change(before["p95_ms"], row["p95_ms"])
+        print(f"{label:<26}{throughput:>+15.1f}%{p95:>+15.1f}%")
+        if throughput < -tolerance or p95 > tolerance:
+            regressions.append(label)
+    return regressions
+
+
+def change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(command, port, timeout=30):
+    # start a server process and wait until it accepts connections on port
+    server = subprocess.Popen(
+        [sys.executable, *command], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit(f"{' '.join(command)} did not start")
+
+
+def run(make_client, dataset, mix, clients, seconds, seed_value):
+    # mix is a {scenario: weight} dict, like the MIXES entries
+    recorder = Recorder()
+    scenarios = list(mix)
+    weights = list(mix.values())
+    deadline = time.monotonic() + seconds
+
+    def work(n):
+        rng = random.Random(seed_value + n)
+        client = make_client(recorder)
+        while time.monotonic() < deadline:
+            rng.choices(scenarios, weights)[0](client, dataset, rng)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--url", help="server to load, in-process when omitted")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--menus", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--topups", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=10)
+    args = parser.parse_args()
+
+    if args.url:
+        def make_client(recorder):
+            return HttpClient(recorder, args.url)
+    else:
+        make_client = InProcessClient
+
+    mix = MIXES[args.mix]
+    sizes = {"users": args.users, "menus": args.menus, "orders": args.orders,
+             "topups": args.topups}
+    dataset = seed(args.users, args.menus, args.orders, args.topups, args.seed)
+    print(f"seeded {sizes} as {dataset.tag}")
+    try:
+        if args.warmup:
+            run(make_client, dataset, mix, args.clients, args.warmup, args.seed)
+        recorder = run(make_client, dataset, mix, args.clients, args.seconds, args.seed)
+    finally:
+        remove(dataset.tag)
+
+    results = summarize(recorder, args.seconds)
+    print(f"mix {args.mix}, {args.clients} clients, {args.seconds}s, "
+          f"{args.url or 'in-process'}")
+    report(results)
+
+    if args.save:
+        with open(args.save, "w") as baseline:
+            json.dump(
+                {
+                    "created": datetime.now(timezone.utc).isoformat(),
+                    "target": args.url or "in-process",
+                    "python": platform.python_version(),
+                    "mix": args.mix,
+                    "clients": args.clients,
+                    "seconds": args.seconds,
+                    "dataset": {**sizes, "seed": args.seed},
+                    "endpoints": results,
+                },
+                baseline,
+                indent=2,
+            )
+        print(f"\nsaved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline), args.tolerance)
+        if regressions:
+            print(f"\nregressed beyond {args.tolerance}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Login throughput for a growing password hashing pool.
+
+Each run replaces the app's PasswordHasher with one of --workers processes
+(0 hashes on the request thread) and lets --clients threads log in for
+--seconds. Logins refused with 503 because the pool queue was full are
+counted separately.
+
+    python -m benchmarks.login_throughput --workers 0 1 2 4 --clients 16
+"""
+import argparse
+import statistics
+import threading
+import time
+from base64 import b64encode
+from uuid import uuid4
+
+from extensions import db
+from hashing import PasswordHasher
+from models import User
+from wsgi import app
+
+
+def run(clients, seconds, headers):
+    latencies = []
+    refused = []
+    deadline = time.monotonic() + seconds
+
+    def login():
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = client.post("/user/login", headers=headers)
+            if response.status_code == 503:
+                refused.append(1)
+                continue
+            assert response.status_code == 200, response.status_code
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=login) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, len(refused)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args()
+
+    rounds = app.config["PASSWORD_HASH_ROUNDS"]
+    email = f"bench-{uuid4().hex[:8]}@example.com"
+    with app.app_context():
+        member = User(
+            name="Benchmark Member",
+            email=email,
+            password=PasswordHasher(rounds=rounds).hash("secret"),
+            role="member",
+        )
+        db.session.add(member)
+        db.session.commit()
+        member_id = member.id
+    headers = {"Authorization": f"Basic {b64encode(f'{email}:secret'.encode()).decode()}"}
+
+    print(f"bcrypt cost {rounds}, {args.clients} clients, {args.seconds}s per run")
+    try:
+        for workers in args.workers:
+            hasher = PasswordHasher(
+                rounds=rounds, workers=workers, max_pending=args.max_pending
+            )
+            app.extensions["coffeeshop"].password_hasher = hasher
+            if workers:
+                # start the pool outside the measurement
+                hasher.check(hasher.hash("warm-up"), "warm-up")
+            latencies, refused = run(args.clients, args.seconds, headers)
+            hasher.shutdown()
+            cuts = statistics.quantiles(latencies, n=100)
+            print(
+                f"workers {workers:>3}  {len(latencies) / args.seconds:8.1f} logins/s"
+                f"  p50 {cuts[49] * 1000:8.1f} ms  p99 {cuts[98] * 1000:8.1f} ms"
+                f"  refused {refused}"
+            )
+    finally:
+        with app.app_context():
+            db.session.delete(db.session.get(User, member_id))
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""p50/p99 latency of the menu endpoints with the catalogue cache on and off.
+
+Run from the repository root against the configured database:
+
+    python -m benchmarks.menu_cache --requests 500
+"""
+import argparse
+import statistics
+import time
+
+from extensions import db
+from models import Menu
+from wsgi import app
+
+
+def latencies(client, path, total, headers=None):
+    samples = []
+    for _ in range(total):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code in (200, 304), response.status_code
+    return samples
+
+
+def report(label, samples):
+    cuts = statistics.quantiles(samples, n=100)
+    print(f"{label:<40} p50 {cuts[49] * 1000:8.3f} ms   p99 {cuts[98] * 1000:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with app.app_context():
+        menu_id = db.session.query(Menu.id).order_by(Menu.id).limit(1).scalar()
+    paths = ["/menu/available", "/menu/all"]
+    if menu_id is not None:
+        paths.append(f"/menu/{menu_id}")
+
+    client = app.test_client()
+    for enabled in (False, True):
+        app.config["MENU_CACHE_ENABLED"] = enabled
+        app.extensions["coffeeshop"].menu_cache.invalidate()
+        state = "on" if enabled else "off"
+        for path in paths:
+            report(f"cache {state:<3} {path}", latencies(client, path, args.requests))
+
+    # revalidation with a matching ETag only sends the 304 headers
+    for path in paths:
+        etag = client.get(path).headers["ETag"]
+        samples = latencies(client, path, args.requests, {"If-None-Match": etag})
+        report(f"304     {path}", samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Menu search latency over a synthetic catalogue of 100k menu items.
+
+By default only the in-process fallback index is measured. With --database
+the synthetic menus are inserted in the configured database and
+/menu/search is timed end to end (pg_trgm when installed), then removed.
+
+    python -m benchmarks.menu_search --items 100000 [--database]
+"""
+import argparse
+import statistics
+import time
+from uuid import uuid4
+
+from benchmarks.dataset import synthetic_menus
+from menu_search import InvertedIndex
+
+QUERIES = {
+    "exact": ["espresso", "croissant", "latte"],
+    "prefix": ["espr", "crois", "cappu"],
+    "typo": ["expresso", "croisant", "capucino"],
+    "multi-word": ["iced latte", "caramel macchiato", "chocolate cake"],
+}
+
+
+def report(label, samples):
+    cuts = statistics.quantiles(samples, n=100)
+    print(f"{label:<28} p50 {cuts[49] * 1000:8.3f} ms   p99 {cuts[98] * 1000:8.3f} ms")
+
+
+def time_queries(search, rounds):
+    for kind, keywords in QUERIES.items():
+        samples = []
+        for _ in range(rounds):
+            for keyword in keywords:
+                start = time.perf_counter()
+                search(keyword)
+                samples.append(time.perf_counter() - start)
+        report(kind, samples)
+
+
+def in_process(items, rounds):
+    rows = [
+        (n, menu["name"], menu["desc"])
+        for n, menu in enumerate(synthetic_menus(items), start=1)
+    ]
+    index = InvertedIndex()
+    start = time.perf_counter()
+    index.build(rows)
+    print(f"fallback index build        {time.perf_counter() - start:8.3f} s")
+    time_queries(index.search, rounds)
+
+
+def database(items, rounds):
+    from extensions import db
+    from models import Menu
+    from wsgi import app
+
+    tag = f"bench{uuid4().hex[:6]}-"
+    with app.app_context():
+        db.session.execute(db.insert(Menu), list(synthetic_menus(items, tag)))
+        db.session.commit()
+    client = app.test_client()
+    try:
+        def search(keyword):
+            response = client.get("/menu/search", query_string={"keyword": keyword})
+            assert response.status_code == 200, response.status_code
+
+        time_queries(search, rounds)
+    finally:
+        with app.app_context():
+            Menu.query.filter(Menu.name.like(f"% {tag}%")).delete(
+                synchronize_session=False
+            )
+            db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--database", action="store_true")
+    args = parser.parse_args()
+
+    if args.database:
+        database(args.items, args.rounds)
+    else:
+        in_process(args.items, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
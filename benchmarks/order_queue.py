@@ -0,0 +1,178 @@
+"""Concurrent simulation of the order queue: members check out while admins complete orders.
+
+The queue is shared by every order of a database, so the simulation runs
+on a temporary SQLite database of its own. --database-url runs it on
+another one, e.g. Postgres, and refuses to start while that database has
+orders in process or waiting. Exits non-zero when the in-process capacity
+was exceeded, an order was completed twice or the leaderboard no longer
+matches the order history:
+
+    python -m benchmarks.order_queue --members 40 --orders 5 --admins 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from app import create_app
+from extensions import db
+from leaderboard import check_leaderboard
+from models import (
+    Balance_Record,
+    Menu,
+    Menu_Stats,
+    Order,
+    Order_Items,
+    User,
+    User_Stats,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=40)
+    parser.add_argument("--orders", type=int, default=5, help="orders per member")
+    parser.add_argument("--admins", type=int, default=4)
+    parser.add_argument(
+        "--database-url", help="database to run on, a temporary SQLite one by default"
+    )
+    args = parser.parse_args()
+
+    if args.database_url:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": args.database_url})
+        with app.app_context():
+            queued = Order.query.filter(
+                Order.status.in_(["in-process", "waiting-list"])
+            ).count()
+        if queued:
+            sys.exit(f"{queued} orders are in process or waiting, the queue must be empty")
+    else:
+        handle, path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(handle)
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+        with app.app_context():
+            db.create_all()
+    try:
+        run(app, args)
+    finally:
+        if not args.database_url:
+            with app.app_context():
+                db.engine.dispose()
+            os.remove(path)
+
+
+def run(app, args):
+    tag = uuid4().hex[:8]
+    emails = [f"bench-{tag}-{n}@example.com" for n in range(args.members)]
+    with app.app_context():
+        users = [
+            User(
+                name="Benchmark Member",
+                email=email,
+                password="-",
+                balance=10**12,
+                role="member",
+            )
+            for email in emails
+        ]
+        menu = Menu(
+            name=f"Benchmark {tag}",
+            desc="-",
+            price=1,
+            stock=32000,
+            img_url="-",
+            category="drinks",
+        )
+        db.session.add_all(users + [menu])
+        db.session.commit()
+        user_ids = [user.id for user in users]
+        menu_id = menu.id
+
+    done = threading.Event()
+    peak_active = [0]
+    completed = [0]
+
+    def checkout(email):
+        client = app.test_client()
+        for _ in range(args.orders):
+            client.post(
+                "/order/create",
+                json={
+                    "order_items": [{"menu_id": menu_id, "quantity": 1}],
+                    "user_data": {"email": email},
+                },
+            )
+
+    def complete():
+        client = app.test_client()
+        while not done.is_set() or pending():
+            with app.app_context():
+                active = (
+                    Order.query.filter(
+                        Order.user_id.in_(user_ids), Order.status == "in-process"
+                    )
+                    .with_entities(Order.id)
+                    .all()
+                )
+                in_process = Order.query.filter_by(status="in-process").count()
+                peak_active[0] = max(peak_active[0], in_process)
+            for (order_id,) in active:
+                if client.put(f"/order/complete/{order_id}").status_code == 200:
+                    completed[0] += 1
+
+    def pending():
+        with app.app_context():
+            return Order.query.filter(
+                Order.user_id.in_(user_ids),
+                Order.status.in_(["in-process", "waiting-list"]),
+            ).count()
+
+    failures = []
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.members + args.admins) as pool:
+            admins = [pool.submit(complete) for _ in range(args.admins)]
+            list(pool.map(checkout, emails))
+            done.set()
+            for admin in admins:
+                admin.result()
+        elapsed = time.perf_counter() - start
+
+        total = args.members * args.orders
+        print(f"orders       {total} in {elapsed:.2f}s ({total / elapsed:.1f} orders/s)")
+        print(f"completed    {completed[0]}")
+        capacity = app.config["ORDER_QUEUE_CAPACITY"]
+        print(f"capacity     {capacity}")
+        print(f"peak active  {peak_active[0]}")
+        if peak_active[0] > capacity:
+            failures.append("CAPACITY EXCEEDED")
+        if completed[0] > total:
+            failures.append(f"COMPLETED {completed[0]} OF {total} ORDERS")
+        with app.app_context():
+            failures.extend(f"LEADERBOARD {line}" for line in check_leaderboard())
+    finally:
+        with app.app_context():
+            order_ids = [
+                o.id for o in Order.query.filter(Order.user_id.in_(user_ids))
+            ]
+            Balance_Record.query.filter(Balance_Record.user_id.in_(user_ids)).delete()
+            Order_Items.query.filter(Order_Items.order_id.in_(order_ids)).delete()
+            Order.query.filter(Order.user_id.in_(user_ids)).delete()
+            User_Stats.query.filter(User_Stats.user_id.in_(user_ids)).delete()
+            Menu_Stats.query.filter_by(menu_id=menu_id).delete()
+            User.query.filter(User.id.in_(user_ids)).delete()
+            Menu.query.filter_by(id=menu_id).delete()
+            db.session.commit()
+
+    for failure in failures:
+        print(failure)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Latency of a database-bound endpoint as the number of worker processes grows.
+
+Each worker imports the app, so it gets its own connection pool sized by the
+DB_POOL_* settings, and runs --threads client threads for --seconds. The menu
+cache is disabled so every request reaches the database.
+
+    python -m benchmarks.pool_scaling --workers 1 2 4 8 --threads 8 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+
+
+def worker(path, threads, seconds, results):
+    os.environ["MENU_CACHE_ENABLED"] = "false"
+    from extensions import db
+    from wsgi import app
+    from db_config import pool_stats
+
+    latencies = []
+    deadline = time.monotonic() + seconds
+
+    def run():
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = client.get(path)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.status_code
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    with app.app_context():
+        results.put((latencies, pool_stats(db.engine)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--path", default="/menu/all")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    for workers in args.workers:
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=worker, args=(args.path, args.threads, args.seconds, results)
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        latencies = [sample for samples, _ in collected for sample in samples]
+        waits = sum(stats.get("waits", 0) for _, stats in collected)
+        timeouts = sum(stats.get("timeouts", 0) for _, stats in collected)
+        cuts = statistics.quantiles(latencies, n=100)
+        print(
+            f"workers {workers:>3}  {len(latencies) / args.seconds:9.1f} req/s"
+            f"  p50 {cuts[49] * 1000:8.3f} ms  p99 {cuts[98] * 1000:8.3f} ms"
+            f"  pool waits {waits}  timeouts {timeouts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Concurrent checkouts against a single menu, checks that stock is never oversold.
+
+Run from the repository root against the configured database:
+
+    python -m benchmarks.stock_checkout --threads 120 --stock 50
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from extensions import db
+from models import Balance_Record, Menu, Order, Order_Items, User
+from wsgi import app
+
+
+def checkout(email, menu_id):
+    client = app.test_client()
+    response = client.post(
+        "/order/create",
+        json={
+            "order_items": [{"menu_id": menu_id, "quantity": 1}],
+            "user_data": {"email": email},
+        },
+    )
+    return response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=120)
+    parser.add_argument("--stock", type=int, default=50)
+    args = parser.parse_args()
+
+    email = f"bench-{uuid4().hex[:8]}@example.com"
+    with app.app_context():
+        member = User(
+            name="Benchmark Member",
+            email=email,
+            password="-",
+            balance=10**12,
+            role="member",
+        )
+        menu = Menu(
+            name=f"Benchmark {email}",
+            desc="-",
+            price=1,
+            stock=args.stock,
+            img_url="-",
+            category="drinks",
+        )
+        db.session.add_all([member, menu])
+        db.session.commit()
+        member_id, menu_id = member.id, menu.id
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            codes = list(pool.map(lambda _: checkout(email, menu_id), range(args.threads)))
+        elapsed = time.perf_counter() - start
+
+        with app.app_context():
+            final_stock = db.session.get(Menu, menu_id).stock
+            ordered = (
+                db.session.query(db.func.coalesce(db.func.sum(Order_Items.quantity), 0))
+                .filter(Order_Items.menu_id == menu_id)
+                .scalar()
+            )
+        accepted = codes.count(201)
+        print(f"checkouts    {args.threads} in {elapsed:.2f}s")
+        print(f"accepted     {accepted}")
+        print(f"rejected     {codes.count(400)}")
+        print(f"other        {len(codes) - accepted - codes.count(400)}")
+        print(f"final stock  {final_stock}")
+        consistent = final_stock >= 0 and args.stock - final_stock == ordered == accepted
+        print("stock is consistent" if consistent else "STOCK OVERSOLD OR DRIFTED")
+    finally:
+        with app.app_context():
+            order_ids = [o.id for o in Order.query.filter_by(user_id=member_id)]
+            Balance_Record.query.filter_by(user_id=member_id).delete()
+            Order_Items.query.filter(Order_Items.order_id.in_(order_ids)).delete()
+            Order.query.filter_by(user_id=member_id).delete()
+            db.session.delete(db.session.get(Menu, menu_id))
+            db.session.delete(db.session.get(User, member_id))
+            db.session.commit()
+
+    if not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
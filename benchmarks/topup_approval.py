@@ -0,0 +1,120 @@
+"""Approving pending top-ups one request per record versus one bulk request.
+
+Run from the repository root against the configured database:
+
+    python -m benchmarks.topup_approval --members 100 --topups 20
+"""
+import argparse
+import sys
+import time
+from base64 import b64encode
+from datetime import datetime
+from uuid import uuid4
+
+from extensions import db, password_hasher
+from models import Balance_Record, User, ledger
+from wsgi import app
+
+NOMINAL = 10000
+
+
+def pending_topups(member_ids, per_member):
+    with app.app_context():
+        records = [
+            Balance_Record(
+                user_id=member_id,
+                member_name="Benchmark Member",
+                nominal=NOMINAL,
+                created_date=datetime.now(),
+                status="created",
+                type="topup",
+            )
+            for member_id in member_ids
+            for _ in range(per_member)
+        ]
+        db.session.add_all(records)
+        db.session.commit()
+        return [record.id for record in records]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=100)
+    parser.add_argument("--topups", type=int, default=20)
+    args = parser.parse_args()
+
+    tag = uuid4().hex[:8]
+    admin_email = f"bench-admin-{tag}@example.com"
+    with app.app_context():
+        members = [
+            User(
+                name="Benchmark Member",
+                email=f"bench-{tag}-{i}@example.com",
+                password="-",
+                role="member",
+            )
+            for i in range(args.members)
+        ]
+        admin = User(
+            name="Benchmark Admin",
+            email=admin_email,
+            password=password_hasher.hash("secret"),
+            role="admin",
+        )
+        db.session.add_all([*members, admin])
+        db.session.commit()
+        member_ids = [member.id for member in members]
+        admin_id = admin.id
+
+    client = app.test_client()
+    credentials = b64encode(f"{admin_email}:secret".encode()).decode()
+    headers = {"Authorization": f"Basic {credentials}"}
+
+    try:
+        record_ids = pending_topups(member_ids, args.topups)
+        start = time.perf_counter()
+        for r_id in record_ids:
+            assert client.put(f"/balance/topup/{r_id}", headers=headers).status_code == 200
+        loop = time.perf_counter() - start
+
+        record_ids = pending_topups(member_ids, args.topups)
+        start = time.perf_counter()
+        response = client.put(
+            "/balance/topup", json={"record_ids": record_ids}, headers=headers
+        )
+        bulk = time.perf_counter() - start
+        assert response.json["data"]["approved"] == len(record_ids)
+
+        # approving the same records again changes nothing
+        again = client.put(
+            "/balance/topup", json={"record_ids": record_ids}, headers=headers
+        ).json["data"]["approved"]
+
+        with app.app_context():
+            balances = {
+                user.id: user.balance
+                for user in User.query.filter(User.id.in_(member_ids))
+            }
+            expected = ledger.balances(db.session, member_ids)
+        consistent = (
+            again == 0
+            and balances == expected
+            and set(balances.values()) == {2 * args.topups * NOMINAL}
+        )
+
+        print(f"top-ups      {len(record_ids)} for {args.members} members")
+        print(f"per record   {loop:.2f}s  ({len(record_ids) / loop:.0f} approvals/s)")
+        print(f"bulk         {bulk:.2f}s  ({len(record_ids) / bulk:.0f} approvals/s)")
+        print("balances are consistent" if consistent else "BALANCES DRIFTED")
+    finally:
+        with app.app_context():
+            Balance_Record.query.filter(Balance_Record.user_id.in_(member_ids)).delete()
+            User.query.filter(User.id.in_([*member_ids, admin_id])).delete()
+            db.session.commit()
+
+    if not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
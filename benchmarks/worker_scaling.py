@@ -0,0 +1,68 @@
+"""Throughput of the gunicorn launcher as the number of workers grows.
+
+For each --workers count a server is started with gunicorn.conf.py, then
+--clients keep-alive connections send a traffic mix of benchmarks.load for
+--seconds. Throughput should grow with the workers up to the number of
+cores, unless the database is the bottleneck.
+
+    python -m benchmarks.worker_scaling --workers 1 2 4 8 --threads 4 --clients 32
+"""
+import argparse
+from os import cpu_count
+
+from benchmarks.dataset import remove, seed
+from benchmarks.load import MIXES, HttpClient, free_port, run, start_server, totals
+
+
+def main():
+    cores = cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, *(2**n for n in range(cores.bit_length())), cores}),
+    )
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="browse")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--menus", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=5000)
+    args = parser.parse_args()
+
+    dataset = seed(args.users, args.menus, args.orders, topups=500)
+    print(f"{cores} cores, mix {args.mix}, {args.clients} clients, "
+          f"{args.threads} threads per worker")
+    print(f"{'workers':>7}{'req/s':>10}{'speedup':>9}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'errors':>8}")
+    baseline = None
+    try:
+        for workers in args.workers:
+            port = free_port()
+            server = start_server(
+                ["-m", "gunicorn", "wsgi:app", "--bind", f"127.0.0.1:{port}",
+                 "--workers", str(workers), "--threads", str(args.threads)],
+                port,
+            )
+            try:
+                recorder = run(
+                    lambda recorder: HttpClient(recorder, f"http://127.0.0.1:{port}"),
+                    dataset, MIXES[args.mix], args.clients, args.seconds, 0,
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            result = totals(recorder, args.seconds)
+            baseline = baseline or result["throughput"]
+            print(f"{workers:>7}{result['throughput']:>10.1f}"
+                  f"{result['throughput'] / baseline:>8.2f}x"
+                  f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                  f"{result['errors']:>8}")
+    finally:
+        remove(dataset.tag)
+
+
+if __name__ == "__main__":
+    main()
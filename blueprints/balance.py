@@ -0,0 +1,231 @@
+from datetime import datetime
+
+from flask import Blueprint, request
+from sqlalchemy import select, tuple_
+
+from auth import auth
+from cart import positive_int
+from extensions import db
+from models import Balance_Record, User, ledger
+from pagination import (
+    InvalidCursor,
+    count_estimate,
+    decode_cursor,
+    encode_cursor,
+    page_limit,
+)
+
+bp = Blueprint("balance", __name__)
+
+
+# top-up balance
+@bp.post("/balance/topup")
+@auth.login_required(role="member")
+def create_top_up():
+    data = request.get_json()
+    if data["nominal"] < 10000:
+        return {
+            "success": False,
+            "message": "Minimum top-up is 10000",
+            "data": {},
+        }, 400
+    user = auth.current_user()
+    new_record = Balance_Record(
+        user_id=user.id,
+        member_name=user.name,
+        nominal=data["nominal"],
+        created_date=datetime.now(),
+        status="created",
+        type="topup",
+    )
+    db.session.add(new_record)
+    db.session.commit()
+    return {
+        "success": True,
+        "message": "Top-up created",
+        "data": {},
+    }, 200
+
+
+# my balance
+@bp.get("/balance")
+@auth.login_required(role="member")
+def get_balance():
+    user = db.session.get(User, auth.current_user().id)
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"balance": user.balance},
+    }, 200
+
+
+# get uncomplete top-ups, oldest first
+# paginated with ?limit=&cursor=, filtered by ?user_id=&min_nominal=&max_nominal=
+@bp.get("/balance/topup")
+@auth.login_required(role="admin")
+def get_uncomplete_top_up():
+    args = request.args
+    query = (
+        select(
+            Balance_Record.id,
+            Balance_Record.user_id,
+            Balance_Record.member_name,
+            Balance_Record.nominal,
+            Balance_Record.created_date,
+        )
+        .where(Balance_Record.type == "topup", Balance_Record.status == "created")
+        .order_by(Balance_Record.created_date, Balance_Record.id)
+    )
+    try:
+        if "user_id" in args:
+            query = query.where(Balance_Record.user_id == int(args["user_id"]))
+        if "min_nominal" in args:
+            query = query.where(Balance_Record.nominal >= int(args["min_nominal"]))
+        if "max_nominal" in args:
+            query = query.where(Balance_Record.nominal <= int(args["max_nominal"]))
+    except ValueError:
+        return {"success": False, "message": "Invalid filter", "data": {}}, 400
+    # matching the filters, whatever page is asked for
+    total = count_estimate(db.session, query)
+
+    # continue after the last row of the previous page
+    if "cursor" in args:
+        try:
+            created_date, record_id = decode_cursor(args["cursor"])
+        except InvalidCursor:
+            return {"success": False, "message": "Invalid cursor", "data": {}}, 400
+        query = query.where(
+            tuple_(Balance_Record.created_date, Balance_Record.id)
+            > tuple_(created_date, record_id)
+        )
+
+    limit = page_limit(args)
+    records = db.session.execute(query.limit(limit)).all()
+    requests = [
+        {
+            "record_id": record.id,
+            "user_id": record.user_id,
+            "member_name": record.member_name,
+            "nominal": record.nominal,
+            "created_date": record.created_date,
+        }
+        for record in records
+    ]
+    next_cursor = None
+    if len(records) == limit:
+        next_cursor = encode_cursor(records[-1].created_date, records[-1].id)
+    return (
+        {
+            "success": True,
+            "message": "Data retrieved",
+            "data": {"requests": requests, "next_cursor": next_cursor},
+        },
+        200,
+        {"X-Total-Count-Estimate": str(total)},
+    )
+
+
+# approve top-up balance
+@bp.put("/balance/topup/<int:r_id>")
+@auth.login_required(role="admin")
+def complete_top_up(r_id):
+    # only one approval can move the record out of "created"
+    if not ledger.approve_topups(db.session, Balance_Record.id == r_id):
+        # told apart like the "not found" outcome of the bulk approval
+        exists = db.session.scalar(
+            select(Balance_Record.id).where(
+                Balance_Record.id == r_id, Balance_Record.type == "topup"
+            )
+        )
+        if exists is None:
+            return {"success": False, "message": "Data not found", "data": {}}, 404
+        return {
+            "success": False,
+            "message": "Top-up already completed",
+            "data": {},
+        }, 400
+    db.session.commit()
+    return {
+        "success": True,
+        "message": "Top-up completed",
+        "data": {},
+    }, 200
+
+
+# approve many top-ups in one transaction, given by "record_ids" or by a
+# "filter" on user_id, created_before and max_nominal; approving every
+# pending top-up takes an explicit {"all": true}, an empty filter is refused
+@bp.put("/balance/topup")
+@auth.login_required(role="admin")
+def complete_top_ups():
+    data = request.get_json()
+    if not isinstance(data, dict):
+        data = {}
+    if "record_ids" in data:
+        record_ids = data["record_ids"]
+        if not isinstance(record_ids, list) or not all(
+            positive_int(r_id) for r_id in record_ids
+        ):
+            return {"success": False, "message": "Invalid record ids", "data": {}}, 400
+        criteria = [Balance_Record.id.in_(record_ids)]
+    elif isinstance(data.get("filter"), dict):
+        filters = data["filter"]
+        criteria = []
+        try:
+            if "user_id" in filters:
+                criteria.append(Balance_Record.user_id == int(filters["user_id"]))
+            if "created_before" in filters:
+                created_before = datetime.fromisoformat(filters["created_before"])
+                criteria.append(Balance_Record.created_date < created_before)
+            if "max_nominal" in filters:
+                criteria.append(Balance_Record.nominal <= int(filters["max_nominal"]))
+        except (TypeError, ValueError):
+            return {"success": False, "message": "Invalid filter", "data": {}}, 400
+        if not criteria and filters.get("all") is not True:
+            return {
+                "success": False,
+                "message": 'Empty filter, send {"all": true} to approve every top-up',
+                "data": {},
+            }, 400
+    else:
+        return {
+            "success": False,
+            "message": "record_ids or filter is required",
+            "data": {},
+        }, 400
+
+    approved = ledger.approve_topups(db.session, *criteria)
+    db.session.commit()
+
+    results = [
+        {"record_id": record.id, "status": "approved", "nominal": record.nominal}
+        for record in approved
+    ]
+    # say why the other requested ids were not approved
+    if "record_ids" in data:
+        approved_ids = {record.id for record in approved}
+        completed = set(
+            db.session.scalars(
+                select(Balance_Record.id).where(
+                    Balance_Record.id.in_(set(record_ids) - approved_ids),
+                    Balance_Record.type == "topup",
+                )
+            )
+        )
+        results.extend(
+            {
+                "record_id": r_id,
+                "status": "already completed" if r_id in completed else "not found",
+            }
+            for r_id in dict.fromkeys(record_ids)
+            if r_id not in approved_ids
+        )
+    return {
+        "success": True,
+        "message": "Top-ups completed",
+        "data": {
+            "approved": len(approved),
+            "total_nominal": sum(record.nominal for record in approved),
+            "results": results,
+        },
+    }, 200
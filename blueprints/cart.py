@@ -0,0 +1,136 @@
+from flask import Blueprint, request
+
+from auth import auth
+from cart import CartError, check_line, clear_cart, positive_int
+from extensions import db, upsert
+from models import Cart_Items, Menu
+
+bp = Blueprint("cart", __name__)
+
+
+# cart lines with the current menu price and stock
+def cart_lines(user_id):
+    rows = (
+        db.session.query(
+            Cart_Items.menu_id,
+            Cart_Items.quantity,
+            Menu.name,
+            Menu.price,
+            Menu.img_url,
+            Menu.stock,
+        )
+        .join(Menu, Menu.id == Cart_Items.menu_id)
+        .filter(Cart_Items.user_id == user_id)
+        .order_by(Cart_Items.menu_id)
+    )
+    return [
+        {
+            "menu_id": line.menu_id,
+            "name": line.name,
+            "price": line.price,
+            "img_url": line.img_url,
+            "stock": line.stock,
+            "quantity": line.quantity,
+            "subtotal": line.price * line.quantity,
+            "available": line.quantity <= line.stock,
+        }
+        for line in rows
+    ]
+
+
+def cart_response(user_id, message="Data found", code=200):
+    lines = cart_lines(user_id)
+    return {
+        "success": True,
+        "message": message,
+        "data": {
+            "cart": lines,
+            "total": sum(line["subtotal"] for line in lines),
+        },
+    }, code
+
+
+def cart_error(error):
+    return {"success": False, "message": error.message, "data": error.data}, error.status
+
+
+# show my cart
+@bp.get("/cart")
+@auth.login_required(role="member")
+def get_cart():
+    return cart_response(auth.current_user().id)
+
+
+# add a menu to my cart, or more of a menu already in it
+# an optional price is the price the client displayed, 409 when it changed
+@bp.post("/cart/items")
+@auth.login_required(role="member")
+def add_cart_item():
+    data = request.get_json()
+    user_id = auth.current_user().id
+    menu_id = data.get("menu_id")
+    quantity = data.get("quantity", 1)
+    # validated like checkout lines (place_order), true is not menu 1
+    menu = db.session.get(Menu, menu_id) if positive_int(menu_id) else None
+    line = db.session.get(Cart_Items, (user_id, menu_id)) if menu else None
+    try:
+        check_line(
+            menu,
+            menu_id,
+            quantity,
+            data.get("price"),
+            in_cart=line.quantity if line else 0,
+        )
+    except CartError as error:
+        return cart_error(error)
+
+    cart_items = Cart_Items.__table__
+    stmt = upsert(cart_items).values(user_id=user_id, menu_id=menu_id, quantity=quantity)
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "menu_id"],
+            set_={"quantity": cart_items.c.quantity + stmt.excluded.quantity},
+        )
+    )
+    db.session.commit()
+    return cart_response(user_id, "Cart updated", 201)
+
+
+# set the quantity of a menu in my cart
+@bp.put("/cart/items/<int:m_id>")
+@auth.login_required(role="member")
+def update_cart_item(m_id):
+    data = request.get_json()
+    user_id = auth.current_user().id
+    line = db.session.get(Cart_Items, (user_id, m_id))
+    if line is None:
+        return {"success": False, "message": "Data not found", "data": {}}, 404
+    try:
+        check_line(
+            db.session.get(Menu, m_id), m_id, data.get("quantity"), data.get("price")
+        )
+    except CartError as error:
+        return cart_error(error)
+    line.quantity = data["quantity"]
+    db.session.commit()
+    return cart_response(user_id, "Cart updated")
+
+
+# remove a menu from my cart
+@bp.delete("/cart/items/<int:m_id>")
+@auth.login_required(role="member")
+def remove_cart_item(m_id):
+    user_id = auth.current_user().id
+    clear_cart(db.session, Cart_Items.__table__, user_id, [m_id])
+    db.session.commit()
+    return cart_response(user_id, "Cart updated")
+
+
+# empty my cart
+@bp.delete("/cart")
+@auth.login_required(role="member")
+def clear_my_cart():
+    user_id = auth.current_user().id
+    clear_cart(db.session, Cart_Items.__table__, user_id)
+    db.session.commit()
+    return cart_response(user_id, "Cart updated")
@@ -0,0 +1,339 @@
+from flask import Blueprint, current_app, request
+from sqlalchemy import func, or_
+
+from auth import auth
+from extensions import db, menu_cache, read_replica, search_backend, search_index
+from menu_search import has_pg_trgm
+from models import Menu, Menu_Stats
+from pagination import page_limit
+from schemas import MenuCard, MenuRow, StockRow, fetch, project
+
+bp = Blueprint("menu", __name__)
+
+
+# serve a menu response from the catalogue cache, answering 304 on matching ETag
+# build() returns the response payload, or None when the menu does not exist
+def menu_cache_response(key, build):
+    entry = menu_cache.get(key) if current_app.config["MENU_CACHE_ENABLED"] else None
+    if entry is None:
+        generation = menu_cache.generation
+        payload = build()
+        if payload is None:
+            return {"success": False, "message": "Data not found", "data": {}}, 404
+        if not current_app.config["MENU_CACHE_ENABLED"]:
+            return payload, 200
+        body = current_app.json.dumps(payload).encode("utf-8")
+        entry = menu_cache.set(key, body, generation)
+    etag, body = entry
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+# add a new menu
+@bp.post("/menu")
+# @auth.login_required(role="admin")
+def add_menu():
+    data = request.get_json()
+
+    new_menu = Menu(
+        name=data["name"],
+        desc=data["desc"],
+        price=data["price"],
+        stock=data["stock"],
+        img_url=data["img_url"],
+        category=data["category"],
+    )
+    db.session.add(new_menu)
+    db.session.commit()
+    menu_cache.invalidate()
+    search_index.invalidate()
+    return {"success": True, "message": "Menu successfully added", "data": {}}, 201
+
+
+# Menu payloads take the session, the async mode (asgi.py) builds them too
+def available_menu(session):
+    in_stock = project(MenuCard, Menu).where(Menu.stock > 0)
+    drinks = fetch(session, MenuCard, in_stock.where(Menu.category == "drinks"))
+    foods = fetch(session, MenuCard, in_stock.where(Menu.category == "foods"))
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"drinks": drinks, "foods": foods},
+    }
+
+
+def all_menu(session):
+    menu_list = fetch(session, MenuRow, project(MenuRow, Menu).order_by(Menu.name))
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"menu_list": menu_list},
+    }
+
+
+# None when the menu does not exist
+def menu_details(session, m_id):
+    menu = session.get(Menu, m_id)
+    if not menu:
+        return None
+    details = {
+        "name": menu.name,
+        "id": menu.id,
+        "img_url": menu.img_url,
+        "price": menu.price,
+        "desc": menu.desc,
+        "stock": menu.stock,
+        "category": menu.category
+    }
+
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"details": details},
+    }
+
+
+# show all in-stock menu
+@bp.get("/menu/available")
+def get_available_menu():
+    return menu_cache_response("available", lambda: available_menu(db.session))
+
+
+@bp.get("/menu/all")
+@read_replica
+def get_all_menu():
+    return menu_cache_response("all", lambda: all_menu(db.session))
+
+
+# show top 5 menu items ordered the most
+@bp.get("/menu/top5")
+@read_replica
+def show_top_menu():
+    base_query = (
+        db.session.query(
+            Menu_Stats.quantity.label("qty"),
+            Menu.name,
+            Menu.desc,
+            Menu.price,
+            Menu.img_url,
+            Menu.id,
+            Menu.stock
+        )
+        .join(Menu, Menu_Stats.menu_id == Menu.id)
+        .order_by(Menu_Stats.quantity.desc())
+    )
+    drink_items = base_query.filter(Menu.category == "drinks").limit(5)
+    food_items = base_query.filter(Menu.category == "foods").limit(5)
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {
+            "drinks": [
+                {
+                    "id": item.id,
+                    "name": item.name,
+                    "desc": item.desc,
+                    "price": item.price,
+                    "img_url": item.img_url,
+                    "qty": item.qty,
+                    "stock": item.stock
+                }
+                for item in drink_items
+            ],
+            "foods": [
+                {
+                    "id": item.id,
+                    "name": item.name,
+                    "desc": item.desc,
+                    "price": item.price,
+                    "img_url": item.img_url,
+                    "qty": item.qty,
+                    "stock": item.stock
+                }
+                for item in food_items
+            ],
+        },
+    }, 200
+
+
+@bp.get("/menu/top5/order")
+@read_replica
+def show_top_menu_order():
+    menu_list = (
+        db.session.query(Menu.name, Menu.price, Menu_Stats.quantity.label("times"))
+        .select_from(Menu_Stats)
+        .join(Menu, Menu_Stats.menu_id == Menu.id)
+        .order_by(Menu_Stats.quantity.desc())
+        .limit(5)
+    )
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {
+            "menu_list": [
+                {
+                    "name": item.name,
+                    "price": item.price,
+                    "times": item.times,
+                }
+                for item in menu_list
+            ],
+        },
+    }, 200
+
+# Menu search
+search_columns = (
+    Menu.id,
+    Menu.name,
+    Menu.desc,
+    Menu.price,
+    Menu.img_url,
+    Menu.category,
+    Menu.stock,
+)
+def trigram_search(keyword, limit):
+    escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    rank = func.greatest(
+        func.word_similarity(keyword, Menu.name),
+        func.word_similarity(keyword, Menu.desc) * 0.5,
+    )
+    return (
+        db.session.query(*search_columns)
+        .filter(
+            Menu.stock > 0,
+            or_(
+                Menu.name.ilike(pattern, escape="\\"),
+                Menu.desc.ilike(pattern, escape="\\"),
+                # word_similarity above pg_trgm.word_similarity_threshold
+                Menu.name.op("%>")(keyword),
+                Menu.desc.op("%>")(keyword),
+            ),
+        )
+        .order_by(rank.desc(), Menu.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def fallback_search(keyword, limit):
+    if search_index.is_stale():
+        search_index.build(db.session.query(Menu.id, Menu.name, Menu.desc))
+    ranked = search_index.search(keyword)
+
+    # walk the ranking in chunks, out-of-stock menus are filtered in SQL
+    menu_list = []
+    for start in range(0, len(ranked), limit * 2):
+        chunk = ranked[start : start + limit * 2]
+        rows = {
+            menu.id: menu
+            for menu in db.session.query(*search_columns).filter(
+                Menu.id.in_(chunk), Menu.stock > 0
+            )
+        }
+        menu_list.extend(rows[m_id] for m_id in chunk if m_id in rows)
+        if len(menu_list) >= limit:
+            break
+    return menu_list[:limit]
+
+
+# search menu, best matches first
+@bp.get("/menu/search")
+@read_replica
+def menu_search():
+    keyword = request.args["keyword"]
+    limit = page_limit(request.args, default=50, maximum=200)
+    if not keyword.strip():
+        # no keyword matches every menu in stock, whatever the backend
+        menu_list = (
+            db.session.query(*search_columns)
+            .filter(Menu.stock > 0)
+            .order_by(Menu.id)
+            .limit(limit)
+            .all()
+        )
+    else:
+        if "pg_trgm" not in search_backend:
+            search_backend["pg_trgm"] = has_pg_trgm(db.session)
+        if search_backend["pg_trgm"]:
+            menu_list = trigram_search(keyword, limit)
+        else:
+            menu_list = fallback_search(keyword, limit)
+    results = [
+        {
+            "id": menu.id,
+            "name": menu.name,
+            "desc": menu.desc,
+            "price": menu.price,
+            "img_url": menu.img_url,
+            "category": menu.category,
+            "stock": menu.stock
+        }
+        for menu in menu_list
+    ]
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"results": results},
+    }, 200
+
+
+# show a menu details
+@bp.get("/menu/<int:m_id>")
+def get_menu(m_id):
+    return menu_cache_response(f"menu:{m_id}", lambda: menu_details(db.session, m_id))
+
+# show a menu details
+@bp.get("/menu/stock/<int:m_id>")
+def get_menu_stock(m_id):
+    menu = db.session.query(Menu).get(m_id)
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"stock": menu.stock},
+    }, 200
+
+
+# show menu items order by lowest stock
+@bp.get("/menu/lowstock")
+# @auth.login_required(role="admin")
+def get_low_stock():
+    menu_list = fetch(
+        db.session, StockRow, project(StockRow, Menu).order_by(Menu.stock).limit(5)
+    )
+    return {
+        "success": True,
+        "message": "Data retrieved",
+        "data": {"menu_list": menu_list},
+    }, 200
+
+
+# update menu stock
+@bp.put("/menu/stock/<int:m_id>")
+@auth.login_required(role="admin")
+def update_menu_stock(m_id):
+    data = request.get_json()
+    menu = Menu.query.get(m_id)
+    menu.stock = data.get("stock", menu.stock)
+    db.session.commit()
+    menu_cache.invalidate()
+    return {"success": True, "message": "menu stock updated", "data": {}}, 200
+
+
+# update menu data
+@bp.put("/menu/<int:m_id>")
+# @auth.login_required(role="admin")
+def update_menu(m_id):
+    data = request.get_json()
+    menu = Menu.query.get(m_id)
+    menu.name = data.get("name", menu.name)
+    menu.desc = data.get("desc", menu.desc)
+    menu.price = data.get("price", menu.price)
+    menu.img_url = data.get("img_url", menu.img_url)
+    menu.stock = data.get("stock", menu.stock)
+    menu.category = data.get("category", menu.category)
+    db.session.commit()
+    menu_cache.invalidate()
+    search_index.invalidate()
+    return {"success": True, "message": "menu updated", "data": {}}, 200
@@ -0,0 +1,394 @@
+from datetime import datetime
+
+from flask import Blueprint, current_app, request, stream_with_context
+from sqlalchemy import func, insert, tuple_, update
+from sqlalchemy.orm import load_only, selectinload
+
+from auth import auth
+from cart import clear_cart, positive_int
+from extensions import db, menu_cache, order_queue, read_replica
+from leaderboard import record_completed_order
+from ledger import InsufficientBalance
+from models import Balance_Record, Cart_Items, Menu, Order, Order_Items, User, ledger
+from pagination import InvalidCursor, decode_cursor, encode_cursor, page_limit
+from schemas import OrderRow, project, records
+from stock import InsufficientStock, order_quantities, release_stock, reserve_stock
+
+bp = Blueprint("order", __name__)
+
+
+# get all order records, newest first
+# paginated with ?limit=&cursor=, or streamed as NDJSON with ?format=ndjson
+@bp.get("/orders/all")
+@read_replica
+def get_all_orders():
+    args = request.args
+    query = project(OrderRow, Order).order_by(
+        Order.created_date.desc(), Order.id.desc()
+    )
+
+    # continue after the last row of the previous page
+    if "cursor" in args.keys():
+        try:
+            created_date, order_id = decode_cursor(args["cursor"])
+        except InvalidCursor:
+            return {"success": False, "message": "Invalid cursor", "data": {}}, 400
+        query = query.where(
+            tuple_(Order.created_date, Order.id) < tuple_(created_date, order_id)
+        )
+
+    if args.get("format") == "ndjson":
+        # rows come from a server-side cursor, memory stays flat
+        def generate():
+            rows = db.session.execute(query.execution_options(yield_per=1000))
+            for order in rows:
+                yield current_app.json.dumps(OrderRow(*order)) + "\n"
+
+        return current_app.response_class(
+            stream_with_context(generate()), mimetype="application/x-ndjson"
+        )
+
+    limit = page_limit(args)
+    orders = db.session.execute(query.limit(limit)).all()
+    order_list = records(OrderRow, orders)
+    next_cursor = None
+    if len(orders) == limit:
+        next_cursor = encode_cursor(orders[-1].created_date, orders[-1].id)
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"order_list": order_list, "next_cursor": next_cursor},
+    }, 200
+
+# create order
+@bp.post("/order/create")
+# @auth.login_required(role="member")
+def create_order():
+    data = request.get_json()
+    # member = auth.current_user()
+    return place_order(db.session, data["order_items"], data["user_data"]["email"])
+
+
+# checkout of create_order, shared with the async mode (asgi.py)
+def place_order(session, items, member_email):
+    member = session.query(User).filter_by(email=member_email).first()
+    new_order = Order(
+        user_id=member.id,
+        customer_name=member.name,
+        created_date=datetime.now(),
+    )
+    total_bill = 0
+
+    # quantity per menu, repeated cart lines are merged
+    quantities = {}
+    # validated like cart lines (cart.check_line)
+    for item in items:
+        if not positive_int(item["quantity"]):
+            return {
+                "success": False,
+                "message": "Invalid quantity",
+                "data": {"menu_id": item["menu_id"]},
+            }, 400
+        if not positive_int(item["menu_id"]):
+            return {
+                "success": False,
+                "message": "Menu not found",
+                "data": {"menu_id": item["menu_id"]},
+            }, 404
+        quantities[item["menu_id"]] = (
+            quantities.get(item["menu_id"], 0) + item["quantity"]
+        )
+
+    # fetch and lock every ordered menu in one query, locked in id order;
+    # FOR NO KEY UPDATE leaves the FOR KEY SHARE of foreign-key checks on
+    # menu (cart and leaderboard upserts) unblocked, the conditional UPDATE
+    # of reserve_stock() guards the stock
+    menus = {
+        menu.id: menu
+        for menu in session.query(Menu)
+        .filter(Menu.id.in_(quantities))
+        .order_by(Menu.id)
+        .with_for_update(key_share=True)
+    }
+
+    order_items = []
+    for item in items:
+        menu = menus.get(item["menu_id"])
+        if not menu:
+            return {
+                "success": False,
+                "message": "Menu not found",
+                "data": {"menu_id": item["menu_id"]},
+            }, 404
+        if quantities[menu.id] > menu.stock:
+            return {
+                "success": False,
+                "message": "Quantity of item(s) exceeds available stock",
+                "data": {"order_item": menu.name, "stock": menu.stock},
+            }, 400
+        order_items.append(
+            {
+                "menu_id": item["menu_id"],
+                "menu_name": menu.name,
+                "quantity": item["quantity"],
+            }
+        )
+        total_bill += menu.price * item["quantity"]
+    new_order.total_bill = total_bill
+    if member.balance < total_bill:
+        return {
+            "success": False,
+            "message": "Unsufficient balance",
+            "data": {},
+        }, 400
+
+    # reserve stock, released again if the order is cancelled
+    try:
+        reserve_stock(session, Menu.__table__, quantities)
+    except InsufficientStock:
+        session.rollback()
+        return {
+            "success": False,
+            "message": "Quantity of item(s) exceeds available stock",
+            "data": {},
+        }, 400
+
+    # serve the order now, or put it in the waiting list when the shop is full
+    order_queue.lock(session)
+    new_order.status = order_queue.admit_status(session)
+    session.add(new_order)
+    session.flush()
+    # every line in one executemany, not an INSERT ... RETURNING per line
+    if order_items:
+        session.execute(
+            insert(Order_Items.__table__),
+            [dict(line, order_id=new_order.id) for line in order_items],
+        )
+    if new_order.status == "waiting-list":
+        waiting_number = order_queue.position(session, new_order)
+        response_message = (
+            f"We apologize, your order is in waiting list number: {waiting_number}"
+        )
+    else:
+        response_message = "Your order is being processed"
+
+    # balance is reduced, unless a concurrent payment already spent it
+    try:
+        ledger.debit(session, member.id, total_bill)
+    except InsufficientBalance:
+        session.rollback()
+        return {
+            "success": False,
+            "message": "Unsufficient balance",
+            "data": {},
+        }, 400
+
+    # insert balance transaction
+    new_record = Balance_Record(
+        user_id=member.id,
+        member_name=member.name,
+        order_id=new_order.id,
+        nominal=total_bill,
+        completed_date=datetime.now(),
+        status="completed",
+        type="payment",
+    )
+    session.add(new_record)
+
+    # ordered menus leave the cart
+    clear_cart(session, Cart_Items.__table__, member.id, list(quantities))
+    session.commit()
+    menu_cache.invalidate()
+    return {
+        "success": True,
+        "message": response_message,
+        "data": {
+            "total_bill": total_bill,
+            "order_id": new_order.id,
+            "status": new_order.status,
+        },
+    }, 201
+
+
+# columns serialized by the order queue and details, items come in one
+# batched SELECT ... WHERE order_id IN (...) instead of one query per order
+order_summary_columns = load_only(
+    Order.id,
+    Order.created_date,
+    Order.total_bill,
+    Order.customer_name,
+    Order.status,
+)
+order_items_columns = selectinload(Order.order_items).load_only(
+    Order_Items.menu_name, Order_Items.quantity
+)
+
+
+# see all waiting-list or in-process orders
+@bp.get("/orders/created")
+@auth.login_required(role="admin")
+def get_orders():
+    args = request.args
+    # number orders per status in the (created_date, id) order of
+    # OrderQueue.position(), so /order/details gives the same number; the
+    # window only spans the listed rows, with ?status the (status,
+    # created_date) index serves it
+    row_number = func.row_number().over(
+        partition_by=Order.status, order_by=(Order.created_date, Order.id)
+    )
+    q = (
+        db.session.query(Order)
+        .options(order_summary_columns, order_items_columns)
+        .add_columns(row_number)
+        .order_by(Order.status, Order.created_date, Order.id)
+    )
+
+    # can only filter by either "in-progress" or "waiting-list" status
+    # if filter status is omitted, it will result all orders including cancelled ones
+    if "status" in args.keys():
+        q = q.filter_by(status=args["status"])
+
+    # queries in the form of list of tuples => [(order1, numb1), (order2, numb2)]
+    queries = q.all()
+    result = [
+        {
+            "order_id": order.id,
+            "created_at": order.created_date,
+            "order_number": number,
+            "items": [
+                {"name": item.menu_name, "qty": item.quantity}
+                for item in order.order_items
+            ],
+            "total_bill": order.total_bill,
+            "member_name": order.customer_name,
+            "status": order.status,
+        }
+        for (order, number) in queries
+    ]
+    return {
+        "success": True,
+        "message": "Data retrieved",
+        "data": {"orders": result},
+    }, 200
+
+
+# order details
+@bp.get("/order/details/<int:o_id>")
+@auth.login_required(role="member")
+def get_order(o_id):
+    order = (
+        db.session.query(Order)
+        .options(order_summary_columns, order_items_columns)
+        .filter_by(id=o_id)
+        .first()
+    )
+    if not order:
+        return {"success": False, "message": "Data not found", "data": {}}, 404
+    number = order_queue.position(db.session, order)
+    details = {
+        "order_id": order.id,
+        "order_number": number,
+        "created_at": order.created_date,
+        "items": [
+            {"name": item.menu_name, "qty": item.quantity} for item in order.order_items
+        ],
+        "total_bill": order.total_bill,
+        "status": order.status,
+    }
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {"details": details},
+    }, 200
+
+
+# complete order
+@bp.put("/order/complete/<int:o_id>")
+# @auth.login_required(role="admin")
+def complete_order(o_id):
+    # only one completion can move the order out of "in-process", so it is
+    # counted once in the leaderboard; a row lock alone does not hold on SQLite
+    completed = db.session.execute(
+        update(Order)
+        .where(Order.id == o_id, Order.status == "in-process")
+        .values(status="completed", completed_date=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    order = db.session.get(Order, o_id)
+    if completed.rowcount != 1:
+        if order is None:
+            return {"success": False, "message": "Data not found", "data": {}}, 404
+        if order.status == "waiting-list":
+            return {
+                "success": False,
+                "message": "Order is still in waiting-list",
+                "data": {},
+            }, 400
+        return {
+            "success": False,
+            "message": "Order cannot be completed",
+            "data": {},
+        }, 400
+
+    # stock was already reserved when the order was created
+    record_completed_order(order)
+
+    # change the oldest waiting-list orders into in-process
+    order_queue.lock(db.session)
+    order_queue.promote(db.session)
+    db.session.commit()
+    return {
+        "success": True,
+        "message": "Order completed",
+        "data": {},
+    }, 200
+
+
+# cancel order and refund
+@bp.put("/order/cancel/<int:o_id>")
+# @auth.login_required(role="member")
+def cancel_order(o_id):
+    # only one cancellation can move the order out of "waiting-list", so
+    # it is refunded once; a row lock alone does not hold on SQLite
+    cancelled = db.session.execute(
+        update(Order)
+        .where(Order.id == o_id, Order.status == "waiting-list")
+        .values(status="cancelled", cancelled_date=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    order = db.session.get(Order, o_id)
+    if cancelled.rowcount != 1:
+        if order is None:
+            return {"success": False, "message": "Data not found", "data": {}}, 404
+        return {
+            "success": False,
+            "message": "Order cannot be cancelled",
+            "data": {},
+        }, 400
+    # refunded to the member who paid the order
+    user = db.session.get(User, order.user_id)
+
+    # give the reserved stock back
+    release_stock(db.session, Menu.__table__, order_quantities(order.order_items))
+
+    # refund
+    ledger.credit(db.session, user.id, order.total_bill)
+
+    # insert balance transaction
+    new_record = Balance_Record(
+        user_id=user.id,
+        member_name=user.name,
+        order_id=order.id,
+        nominal=order.total_bill,
+        completed_date=datetime.now(),
+        status="completed",
+        type="refund",
+    )
+    db.session.add(new_record)
+    db.session.commit()
+    menu_cache.invalidate()
+    return {
+        "success": True,
+        "message": "Order cancelled",
+        "data": {},
+    }, 200
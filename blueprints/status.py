@@ -0,0 +1,42 @@
+from flask import Blueprint
+
+from auth import auth
+from db_config import pool_stats
+from extensions import db, replica_router
+
+bp = Blueprint("status", __name__)
+
+
+@bp.get("/")
+def welcome():
+    return {"success": True, "message": "Welcome to Coffee Shop API", "data": {}}
+
+
+# connection pool usage of this worker
+@bp.get("/metrics/pool")
+@auth.login_required(role="admin")
+def get_pool_metrics():
+    stats = pool_stats(db.engine)
+    stats["replicas"] = replica_router.status()
+    return {"success": True, "message": "Data found", "data": stats}, 200
+
+
+# connection pool state of every engine for /metrics
+POOL_METRICS = {
+    "size": ("gauge", "Connections kept in the pool."),
+    "checked_out": ("gauge", "Connections in use."),
+    "checked_in": ("gauge", "Idle connections in the pool."),
+    "overflow": ("gauge", "Connections opened beyond the pool size."),
+    "checkouts": ("counter", "Connections handed out."),
+    "waits": ("counter", "Checkouts that had to wait for a connection."),
+    "wait_seconds": ("counter", "Time spent waiting for a connection."),
+    "timeouts": ("counter", "Checkouts that gave up waiting."),
+}
+
+
+def pool_metrics():
+    for bind, engine in db.engines.items():
+        stats = pool_stats(engine)
+        for field, (kind, help) in POOL_METRICS.items():
+            if field in stats:
+                yield f"db_pool_{field}", kind, help, {"bind": bind or "primary"}, stats[field]
@@ -0,0 +1,226 @@
+from flask import Blueprint, current_app, request
+from sqlalchemy import select
+
+from auth import auth, issue_token, rehash_password
+from blueprints.cart import cart_lines
+from cart import cart_quantities, sync_cart
+from extensions import credential_cache, db, password_hasher, read_replica
+from hashing import HashingBusy
+from models import Cart_Items, Menu, User, User_Stats
+from schemas import UserRow, fetch, project
+
+bp = Blueprint("user", __name__)
+
+
+# every password hashing worker is busy and the queue is full
+@bp.app_errorhandler(HashingBusy)
+def hashing_busy(error):
+    return (
+        {"success": False, "message": "Server busy, try again later", "data": {}},
+        503,
+        {"Retry-After": "1"},
+    )
+
+
+# user login
+@bp.post("/user/login")
+def login():
+    username = request.authorization["username"]
+    password = request.authorization["password"]
+
+    user = User.query.filter_by(email=username).first()
+
+    # user with that email not found, call Error Auth Handler
+    if not user:
+        return {"success": False, "message": "User not found", "data": {}}, 404
+
+    # check password
+    is_valid = password_hasher.check(user.password, password)
+    if is_valid:
+        rehash_password(user, password)
+
+    # password correct, call Authorization
+    if is_valid:
+        cart = cart_lines(user.id)
+        data = {
+            "name": user.name,
+            "email": user.email,
+            "balance": user.balance,
+            "cart": cart,
+            "role": user.role,
+        }
+        if current_app.config["AUTH_TOKEN_ENABLED"]:
+            data["token"] = issue_token(user)
+            data["expires_in"] = current_app.config["AUTH_TOKEN_TTL"]
+        return {"success": True, "message": "User found", "data": data}, 200
+
+    # password incorrect, call Error Auth Handler
+    else:
+        return {"success": False, "message": "Unauthorized", "data": {}}, 401
+
+# admin login
+@bp.post("/admin/login")
+def admin_login():
+    username = request.authorization["username"]
+    password = request.authorization["password"]
+
+    user = User.query.filter_by(email=username).first()
+
+    # user with that email not found, call Error Auth Handler
+    if not user:
+        return {"success": False, "message": "Data not found", "data": {}}, 404
+
+    # check password
+    is_valid = password_hasher.check(user.password, password)
+    if is_valid:
+        rehash_password(user, password)
+
+    # password correct, call Authorization
+    if is_valid and user.role == "admin":
+        data = {
+            "name": user.name,
+            "email": user.email,
+        }
+        if current_app.config["AUTH_TOKEN_ENABLED"]:
+            data["token"] = issue_token(user)
+            data["expires_in"] = current_app.config["AUTH_TOKEN_TTL"]
+        return {"success": True, "message": "Sign In Successful", "data": data}, 200
+
+    # password corret, but not admin
+    elif is_valid and user.role != "admin":
+        return {"success": False, "message": "You have no access", "data": {}}, 403
+    
+    # password incorrect, call Error Auth Handler
+    else:
+        return {"success": False, "message": "Incorrect password", "data": {}}, 401
+
+
+# register a new user
+@bp.post("/user/register")
+def add_user():
+    data = request.get_json()
+    user = User.query.filter_by(email=data["email"]).first()
+    if user:
+        return {"success": False, "message": "Email already exists", "data": {}}, 400
+    hash_pw = password_hasher.hash(data["password"])
+    new_user = User(
+        name=data["name"],
+        email=data["email"],
+        password=hash_pw,
+        role=data["role"],
+    )
+    db.session.add(new_user)
+    db.session.commit()
+    return {"success": True, "message": "Account created successfully", "data": {}}, 201
+
+
+# log out and save cart data
+@bp.put("/user/logout")
+def logout():
+    data = request.get_json()
+    email = data["userData"]["email"]
+    user = db.session.query(User).filter_by(email=email).first()
+
+    # lines of menus that no longer exist are dropped
+    quantities = cart_quantities(data["cartData"])
+    known = set(db.session.scalars(select(Menu.id).where(Menu.id.in_(quantities))))
+    sync_cart(
+        db.session,
+        Cart_Items.__table__,
+        user.id,
+        {m_id: qty for m_id, qty in quantities.items() if m_id in known},
+    )
+    db.session.commit()
+
+    return {"success": True, "message": "Logged out", "data": {}}, 200
+
+
+# change name or password of member or admin
+@bp.put("/user/update")
+# @auth.login_required(role=["member", "admin"])
+def update_user():
+    data = request.get_json()
+    # user = auth.current_user()
+    user = db.session.query(User).filter_by(email=data["email"]).first()
+    user.name = data.get("name", user.name)
+
+    # handle to change password
+    if "new_password" in data.keys():
+        is_valid = password_hasher.check(user.password, data["old_password"])
+        if is_valid:
+            user.password = password_hasher.hash(data["new_password"])
+        else:
+            return {
+                "success": False,
+                "message": "Incorrect old password",
+                "data": {},
+            }, 400
+    db.session.commit()
+
+    # drop cached credentials of this account
+    credential_cache.invalidate(user.email)
+    return {"success": True, "message": "Account data updated", "data": {}}, 200
+
+
+# show all users
+@bp.get("/users/all")
+@auth.login_required(role="admin")
+def get_users():
+    users = fetch(db.session, UserRow, project(UserRow, User))
+    return {"success": True, "message": "Data found", "data": {"users": users}}, 200
+
+
+# show top 5 users most frequently create orders
+@bp.get("/users/top5/order")
+# @auth.login_required(role="admin")
+@read_replica
+def show_top_user_order():
+    users = (
+        db.session.query(User.name, User.email, User_Stats.order_count)
+        .select_from(User_Stats)
+        .join(User, User.id == User_Stats.user_id)
+        .order_by(User_Stats.order_count.desc())
+        .limit(5)
+    )
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {
+            "members": [
+                {
+                    "name": user.name,
+                    "email": user.email,
+                    "order_times": user.order_count,
+                }
+                for user in users
+            ]
+        },
+    }, 200
+
+
+# show top 5 users highest spend
+@bp.get("/users/top5/spend")
+# @auth.login_required(role="admin")
+@read_replica
+def show_top_user_spend():
+    users = (
+        db.session.query(User.name, User.email, User_Stats.spend)
+        .select_from(User_Stats)
+        .join(User, User.id == User_Stats.user_id)
+        .order_by(User_Stats.spend.desc())
+        .limit(5)
+    )
+    return {
+        "success": True,
+        "message": "Data found",
+        "data": {
+            "members": [
+                {
+                    "name": user.name,
+                    "email": user.email,
+                    "bill_sum": user.spend,
+                }
+                for user in users
+            ]
+        },
+    }, 200
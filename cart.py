@@ -0,0 +1,80 @@
+from sqlalchemy import delete, insert, select
+
+
+class CartError(Exception):
+    def __init__(self, message, data=None, status=400):
+        super().__init__(message)
+        self.message = message
+        self.data = data or {}
+        self.status = status
+
+
+# Carts are stored one row per (user, menu) in cart_items, see Cart_Items.
+# A line is checked against the current menu when it is written, and again
+# by /order/create at checkout since price and stock can change meanwhile.
+
+
+def cart_quantities(cart_data):
+    # {menu_id: quantity} of cart lines sent by a client, lines without a
+    # usable menu id or quantity are skipped and repeated menus are merged
+    quantities = {}
+    for line in cart_data or []:
+        if not isinstance(line, dict):
+            continue
+        menu_id = line.get("menu_id", line.get("id"))
+        quantity = line.get("quantity", line.get("qty"))
+        if not positive_int(menu_id) or not positive_int(quantity):
+            continue
+        quantities[menu_id] = quantities.get(menu_id, 0) + quantity
+    return quantities
+
+
+def positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def check_line(menu, menu_id, quantity, price=None, in_cart=0):
+    # raise CartError unless `quantity` more of the menu can go in a cart
+    # already holding `in_cart` of it, `price` is the price the client
+    # showed, if it sent one
+    if not positive_int(quantity):
+        raise CartError("Invalid quantity", {"menu_id": menu_id})
+    if menu is None:
+        raise CartError("Menu not found", {"menu_id": menu_id}, status=404)
+    if price is not None and price != menu.price:
+        raise CartError(
+            "Menu price changed", {"menu_id": menu.id, "price": menu.price}, status=409
+        )
+    if in_cart + quantity > menu.stock:
+        raise CartError(
+            "Quantity of item(s) exceeds available stock",
+            {"order_item": menu.name, "stock": menu.stock},
+        )
+
+
+def sync_cart(session, cart_table, user_id, quantities):
+    # make the stored cart equal to `quantities`, only changed lines are written
+    current = dict(
+        session.execute(
+            select(cart_table.c.menu_id, cart_table.c.quantity).where(
+                cart_table.c.user_id == user_id
+            )
+        ).all()
+    )
+    stale = [m_id for m_id, qty in current.items() if quantities.get(m_id) != qty]
+    fresh = [
+        {"user_id": user_id, "menu_id": m_id, "quantity": qty}
+        for m_id, qty in quantities.items()
+        if current.get(m_id) != qty
+    ]
+    if stale:
+        clear_cart(session, cart_table, user_id, stale)
+    if fresh:
+        session.execute(insert(cart_table), fresh)
+
+
+def clear_cart(session, cart_table, user_id, menu_ids=None):
+    stmt = delete(cart_table).where(cart_table.c.user_id == user_id)
+    if menu_ids is not None:
+        stmt = stmt.where(cart_table.c.menu_id.in_(menu_ids))
+    session.execute(stmt)
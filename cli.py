@@ -0,0 +1,68 @@
+import click
+from flask.cli import AppGroup, ScriptInfo
+
+from extensions import db
+from leaderboard import check_leaderboard, rebuild_leaderboard
+from models import ledger
+
+
+# command groups registered on the app by create_app()
+@click.group(cls=AppGroup)
+def leaderboard():
+    """Maintain the top 5 leaderboard tables."""
+
+
+@leaderboard.command("rebuild")
+def leaderboard_rebuild():
+    """Recompute the leaderboard from the order history."""
+    rebuild_leaderboard()
+    click.echo("Leaderboard rebuilt")
+
+
+@leaderboard.command("check")
+def leaderboard_check():
+    """Compare the leaderboard with the order history."""
+    mismatches = check_leaderboard()
+    for mismatch in mismatches:
+        click.echo(mismatch)
+    if mismatches:
+        raise SystemExit(1)
+    click.echo("Leaderboard is consistent")
+
+
+@click.group("ledger", cls=AppGroup)
+def ledger_cli():
+    """Maintain the balance ledger."""
+
+
+@ledger_cli.command("reconcile")
+@click.option("--fix", is_flag=True, help="Reset drifted balances from the records.")
+def ledger_reconcile(fix):
+    """Compare every balance with the balance records."""
+    drifted = ledger.reconcile(db.session, fix=fix)
+    for user_id, balance, expected in drifted:
+        click.echo(f"user {user_id}: balance {balance}, expected {expected}")
+    if drifted and not fix:
+        raise SystemExit(1)
+    db.session.commit()
+    click.echo("Balances fixed" if drifted else "Balances are consistent")
+
+
+class MigrateCommand(click.Command):
+    """`flask db`, the commands of Flask-Migrate.
+
+    Flask-Migrate and alembic are imported when it runs rather than by
+    create_app(), the servers never need them.
+    """
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as commands
+
+        app = parent.ensure_object(ScriptInfo).load_app()
+        if "migrate" not in app.extensions:
+            Migrate(app, db)
+        return commands.make_context(info_name, args, parent=parent, **extra)
+
+
+migrate_cli = MigrateCommand("db", help="Perform database migrations.")
@@ -0,0 +1,64 @@
+import secrets
+
+from db_config import database_uri, engine_options, env_flag
+from replica import replica_binds
+
+
+def load_config(environ, overrides=None):
+    # the settings of create_app(), read from the environment; overrides
+    # replace them, a database URI given there makes DATABASE_URL optional
+    overrides = overrides or {}
+    config = {}
+    config["SQLALCHEMY_DATABASE_URI"] = (
+        overrides.get("SQLALCHEMY_DATABASE_URI") or database_uri(environ)
+    )
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+        environ, config["SQLALCHEMY_DATABASE_URI"]
+    )
+    config["DB_PGBOUNCER"] = env_flag(environ, "DB_PGBOUNCER", "false")
+    config["DB_STATEMENT_TIMEOUT"] = int(environ.get("DB_STATEMENT_TIMEOUT", 0))
+    config["DB_REPLICA_URLS"] = [
+        url.strip() for url in environ.get("DB_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    config["DB_REPLICA_MAX_STALENESS"] = float(
+        environ.get("DB_REPLICA_MAX_STALENESS", 5)
+    )
+    config["DB_REPLICA_CHECK_INTERVAL"] = float(
+        environ.get("DB_REPLICA_CHECK_INTERVAL", 1)
+    )
+    config["SQLALCHEMY_BINDS"] = replica_binds(
+        config["DB_REPLICA_URLS"], lambda url: engine_options(environ, url)
+    )
+    config["AUTH_CACHE_ENABLED"] = environ.get("AUTH_CACHE_ENABLED", "true") == "true"
+    config["AUTH_CACHE_TTL"] = int(environ.get("AUTH_CACHE_TTL", 300))
+    config["AUTH_CACHE_MAX_SIZE"] = int(environ.get("AUTH_CACHE_MAX_SIZE", 1024))
+    # every worker must share the same SECRET_KEY to accept each other's tokens
+    config["SECRET_KEY"] = environ.get("SECRET_KEY")
+    config["AUTH_TOKEN_ENABLED"] = environ.get("AUTH_TOKEN_ENABLED", "false") == "true"
+    config["AUTH_TOKEN_TTL"] = int(environ.get("AUTH_TOKEN_TTL", 3600))
+    config["MENU_CACHE_ENABLED"] = environ.get("MENU_CACHE_ENABLED", "true") == "true"
+    config["MENU_CACHE_TTL"] = int(environ.get("MENU_CACHE_TTL", 5))
+    config["ORDER_QUEUE_CAPACITY"] = int(environ.get("ORDER_QUEUE_CAPACITY", 10))
+    config["SEARCH_INDEX_TTL"] = int(environ.get("SEARCH_INDEX_TTL", 60))
+    config["PASSWORD_HASH_ROUNDS"] = int(environ.get("PASSWORD_HASH_ROUNDS", 12))
+    # per server process: every gunicorn / uvicorn worker starts its own pool
+    config["PASSWORD_HASH_WORKERS"] = int(environ.get("PASSWORD_HASH_WORKERS", 1))
+    config["PASSWORD_HASH_MAX_PENDING"] = int(
+        environ.get("PASSWORD_HASH_MAX_PENDING", 64)
+    )
+    config["PASSWORD_HASH_TIMEOUT"] = int(environ.get("PASSWORD_HASH_TIMEOUT", 10))
+    config["METRICS_ENABLED"] = env_flag(environ, "METRICS_ENABLED", "false")
+    config["PROFILE_SLOW_REQUEST_MS"] = int(environ.get("PROFILE_SLOW_REQUEST_MS", 0))
+    config["PROFILE_INTERVAL_MS"] = int(environ.get("PROFILE_INTERVAL_MS", 5))
+    config["PROFILE_DIR"] = environ.get("PROFILE_DIR", "profiles")
+    config["JSON_ENCODER"] = environ.get("JSON_ENCODER", "auto")
+    config["JSON_DATETIME_FORMAT"] = environ.get("JSON_DATETIME_FORMAT", "http")
+    config.update(overrides)
+    if not config["SECRET_KEY"]:
+        # a key made up per process would reject the tokens of the other
+        # workers, and all of them after a restart
+        if config["AUTH_TOKEN_ENABLED"]:
+            raise ValueError("SECRET_KEY must be set when AUTH_TOKEN_ENABLED is true")
+        # nothing is signed with it
+        config["SECRET_KEY"] = secrets.token_hex(32)
+    return config
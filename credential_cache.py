@@ -0,0 +1,77 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+class CredentialCache:
+    """Bounded, TTL-based cache of credentials that already passed bcrypt.
+
+    Entries are keyed by a keyed BLAKE2b digest of (email, password), so the
+    plain password is never kept in memory. The key is random per process.
+    """
+
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._by_email = {}
+        self._lock = threading.Lock()
+
+    def _digest(self, email, password):
+        message = email.encode("utf-8") + b"\x00" + password.encode("utf-8")
+        return hashlib.blake2b(message, key=self._key, digest_size=32).digest()
+
+    def get(self, email, password):
+        # return (user_id, password_hash) of a verified credential, or None
+        digest = self._digest(email, password)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            cached_email, user_id, password_hash, expires_at = entry
+            # compare_digest only takes ASCII str, emails may not be
+            if expires_at < time.monotonic() or not hmac.compare_digest(
+                cached_email.encode("utf-8"), email.encode("utf-8")
+            ):
+                self._remove(digest)
+                return None
+            self._entries.move_to_end(digest)
+            return user_id, password_hash
+
+    def set(self, email, password, user_id, password_hash):
+        digest = self._digest(email, password)
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if digest in self._entries:
+                self._remove(digest)
+            self._entries[digest] = (email, user_id, password_hash, expires_at)
+            self._by_email.setdefault(email, set()).add(digest)
+            # evict least recently used entries
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, email):
+        with self._lock:
+            for digest in self._by_email.pop(email, set()):
+                self._entries.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_email.clear()
+
+    def _remove(self, digest):
+        email = self._entries.pop(digest)[0]
+        digests = self._by_email.get(email)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_email[email]
+
+    def __len__(self):
+        return len(self._entries)
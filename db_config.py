@@ -0,0 +1,157 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+# asyncio driver per dialect, used by the async mode (asgi.py)
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def env_flag(environ, name, default):
+    return environ.get(name, default).lower() == "true"
+
+
+def database_uri(environ):
+    # DATABASE_URL wins, otherwise the URI is built from its parts
+    if environ.get("DATABASE_URL"):
+        return environ["DATABASE_URL"]
+    username = environ["USER_NAME"]
+    password = environ["PASSWORD"]
+    host = environ.get("DB_HOST", "localhost")
+    port = environ.get("DB_PORT", "5432")
+    name = environ.get("DB_NAME", "coffeeshop")
+    return f"postgresql://{username}:{password}@{host}:{port}/{name}"
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            # a checkout served from an idle connection takes microseconds
+            if waited > 0.001:
+                self.waits += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+class MeasuredQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+class MeasuredAsyncQueuePool(MeasuredQueuePool, AsyncAdaptedQueuePool):
+    """MeasuredQueuePool for asyncio engines."""
+
+
+def async_database_uri(uri):
+    url = make_url(uri)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+def engine_options(environ, uri):
+    if uri.startswith("sqlite"):
+        return {}
+
+    options = {"pool_pre_ping": env_flag(environ, "DB_POOL_PRE_PING", "true")}
+
+    # PgBouncer (transaction pooling) already pools server connections and
+    # does not accept startup options, see set_transaction_timeout()
+    if env_flag(environ, "DB_PGBOUNCER", "false"):
+        options["poolclass"] = NullPool
+        return options
+
+    options.update(
+        poolclass=MeasuredQueuePool,
+        pool_size=int(environ.get("DB_POOL_SIZE", 5)),
+        max_overflow=int(environ.get("DB_MAX_OVERFLOW", 10)),
+        pool_timeout=int(environ.get("DB_POOL_TIMEOUT", 30)),
+        pool_recycle=int(environ.get("DB_POOL_RECYCLE", 1800)),
+    )
+    statement_timeout = int(environ.get("DB_STATEMENT_TIMEOUT", 0))
+    if statement_timeout:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={statement_timeout}"
+        }
+    return options
+
+
+def async_engine_options(environ, uri):
+    # engine_options() for the asyncio drivers
+    options = engine_options(environ, uri)
+    if options.get("poolclass") is MeasuredQueuePool:
+        options["poolclass"] = MeasuredAsyncQueuePool
+    if uri.startswith("sqlite"):
+        return options
+    connect_args = {}
+    if env_flag(environ, "DB_PGBOUNCER", "false"):
+        # asyncpg caches prepared statements per connection, PgBouncer
+        # hands each transaction a different server connection
+        connect_args["statement_cache_size"] = 0
+    elif "connect_args" in options:
+        statement_timeout = environ["DB_STATEMENT_TIMEOUT"]
+        connect_args["server_settings"] = {"statement_timeout": statement_timeout}
+    options["connect_args"] = connect_args
+    return options
+
+
+def dispose_after_fork(engines):
+    # in a forked process: drop the inherited connections without closing
+    # them, they still belong to the parent, and start with empty pools
+    for engine in engines:
+        engine.dispose(close=False)
+
+
+def set_transaction_timeout(engine, statement_timeout):
+    # used in PgBouncer mode, SET LOCAL only lasts for the transaction
+    @event.listens_for(engine, "begin")
+    def set_statement_timeout(connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {statement_timeout}")
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics:
+        stats.update(
+            checkouts=metrics.checkouts,
+            waits=metrics.waits,
+            wait_seconds=round(metrics.wait_seconds, 6),
+            max_wait_seconds=round(metrics.max_wait_seconds, 6),
+            timeouts=metrics.timeouts,
+        )
+    return stats
@@ -0,0 +1,53 @@
+from functools import wraps
+
+from flask import current_app, g
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
+from werkzeug.local import LocalProxy
+
+from replica import RoutingSession
+
+# bound to an app by create_app()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+# per-app objects built by create_app() from its config, see app.Services
+def service(name):
+    return LocalProxy(lambda: getattr(current_app.extensions["coffeeshop"], name))
+
+
+menu_cache = service("menu_cache")
+search_index = service("search_index")
+search_backend = service("search_backend")
+credential_cache = service("credential_cache")
+password_hasher = service("password_hasher")
+replica_router = service("replica_router")
+order_queue = service("order_queue")
+token_serializer = service("token_serializer")
+
+
+def upsert(table):
+    if db.session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+# run a read-only view on a healthy replica, or on the primary when there is none
+# a replica failing mid-request is marked down and the view runs again on the primary
+def read_replica(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        chosen = replica_router.choose()
+        if chosen is None:
+            return view(*args, **kwargs)
+        key, g.replica = chosen
+        try:
+            return view(*args, **kwargs)
+        except OperationalError:
+            replica_router.mark_down(key)
+            db.session.rollback()
+            g.replica = None
+            return view(*args, **kwargs)
+
+    return wrapper
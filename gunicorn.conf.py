@@ -0,0 +1,41 @@
+"""Production server settings, read by gunicorn from the working directory.
+
+    gunicorn wsgi:app
+
+Workers are forked from the master after it imported the app (preload), so
+they share its memory; post_fork() gives each worker its own connection
+pools. `kill -HUP <master pid>` replaces the workers gracefully: new ones
+are started, the old ones finish their requests within graceful_timeout.
+With WEB_PRELOAD=false the new workers also load new code.
+"""
+from os import cpu_count, environ
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = environ.get("WEB_BIND", "0.0.0.0:8000")
+workers = int(environ.get("WEB_WORKERS", cpu_count() or 1))
+# threads > 1 selects the gthread worker, keep it within the pool size
+# (DB_POOL_SIZE + DB_MAX_OVERFLOW) so threads do not wait for connections
+threads = int(environ.get("WEB_THREADS", 4))
+timeout = int(environ.get("WEB_TIMEOUT", 30))
+graceful_timeout = int(environ.get("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(environ.get("WEB_KEEPALIVE", 5))
+# recycle a worker after this many requests, 0 never does
+max_requests = int(environ.get("WEB_MAX_REQUESTS", 0))
+max_requests_jitter = int(environ.get("WEB_MAX_REQUESTS_JITTER", 0))
+preload_app = environ.get("WEB_PRELOAD", "true").lower() == "true"
+accesslog = environ.get("WEB_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # the pools copied from the master hold its connections, a worker
+    # sharing them would interleave its queries with the other workers'
+    from db_config import dispose_after_fork
+    from extensions import db
+    from wsgi import app
+
+    with app.app_context():
+        dispose_after_fork(db.engines.values())
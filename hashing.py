@@ -0,0 +1,107 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+class HashingBusy(Exception):
+    pass
+
+
+# run in the pool processes, must stay importable module-level functions
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode(
+        "utf-8"
+    )
+
+
+def _check(password_hash, password):
+    return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+def hash_rounds(password_hash):
+    # cost factor of a "$2b$12$..." hash
+    try:
+        return int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """bcrypt hashing and checking in a pool of worker processes.
+
+    A login burst then waits on the pool instead of holding every request
+    thread on bcrypt. At most `max_pending` calls are queued or running,
+    further calls raise HashingBusy right away. With workers=0 bcrypt runs
+    on the request thread. The pool is started on first use, so each
+    server worker process gets its own after forking.
+    """
+
+    def __init__(self, rounds=12, workers=0, max_pending=64, timeout=10, observe=None):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        # called with the seconds each hash or check took, queueing included
+        self.observe = observe
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawned, forking a threaded server is unsafe
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _run(self, function, *args):
+        if not self.workers:
+            return function(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        pool = self._get_pool()
+        try:
+            future = pool.submit(function, *args)
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise HashingBusy()
+        except BrokenProcessPool:
+            # a worker died, the next call starts a new pool
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False)
+            raise
+        finally:
+            self._slots.release()
+
+    def _timed(self, function, *args):
+        start = time.perf_counter()
+        try:
+            return self._run(function, *args)
+        finally:
+            if self.observe is not None:
+                self.observe(time.perf_counter() - start)
+
+    def hash(self, password):
+        return self._timed(_hash, password, self.rounds)
+
+    def check(self, password_hash, password):
+        return self._timed(_check, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return hash_rounds(password_hash) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
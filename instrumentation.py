@@ -0,0 +1,278 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# per request time spent in each part, exported as <prefix>_request_<part>_seconds
+PARTS = ("db", "serialize", "hash")
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield sample(f"{name}_bucket", {**labels, "le": str(bound)}, cumulative)
+        cumulative += self.counts[-1]
+        yield sample(f"{name}_bucket", {**labels, "le": "+Inf"}, cumulative)
+        yield sample(f"{name}_sum", labels, self.sum)
+        yield sample(f"{name}_count", labels, cumulative)
+
+
+def sample(name, labels, value):
+    if not labels:
+        return f"{name} {value}"
+    escaped = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(label).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, label in labels.items()
+    )
+    return f"{name}{{{escaped}}} {value}"
+
+
+class RequestStats:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.statements = 0
+        self.seconds = dict.fromkeys(PARTS, 0.0)
+
+
+def add_time(part, seconds):
+    # account `seconds` of `part` to the current request, if it is measured
+    if has_app_context():
+        stats = g.get("request_stats")
+        if stats is not None:
+            stats.seconds[part] += seconds
+
+
+class Instrumentation:
+    """Per route latency, SQL and serialization metrics in Prometheus text format.
+
+    Metrics are kept per worker process, Prometheus adds them up across
+    the scraped processes. Collectors registered with add_collector() are
+    evaluated on each scrape.
+    """
+
+    def __init__(self, prefix="coffeeshop"):
+        self.prefix = prefix
+        self._latency = {}
+        self._statements = {}
+        self._parts = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app, engines, path="/metrics"):
+        for engine in engines:
+            self.watch_engine(engine)
+        self.time_serialization(app)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule(path, "metrics", self.metrics_view)
+
+    def watch_engine(self, engine):
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, params, context, many):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, params, context, many):
+            elapsed = time.perf_counter() - conn.info["query_start"].pop()
+            if has_app_context():
+                stats = g.get("request_stats")
+                if stats is not None:
+                    stats.statements += 1
+                    stats.seconds["db"] += elapsed
+
+    def time_serialization(self, app):
+        # every response body and cached menu payload goes through app.json.dumps
+        provider = app.json
+        dumps = provider.dumps
+
+        def timed_dumps(obj, **kwargs):
+            start = time.perf_counter()
+            try:
+                return dumps(obj, **kwargs)
+            finally:
+                add_time("serialize", time.perf_counter() - start)
+
+        provider.dumps = timed_dumps
+
+    def add_collector(self, collect):
+        # collect() yields (name, type, help, labels, value) tuples
+        self._collectors.append(collect)
+
+    def _before_request(self):
+        g.request_stats = RequestStats()
+
+    def _after_request(self, response):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        key = (route, request.method)
+        with self._lock:
+            latency = self._latency.setdefault(
+                key + (response.status_code,), Histogram(LATENCY_BUCKETS)
+            )
+            latency.observe(time.perf_counter() - stats.start)
+            if key not in self._statements:
+                self._statements[key] = Histogram(STATEMENT_BUCKETS)
+                self._parts[key] = {part: Histogram(LATENCY_BUCKETS) for part in PARTS}
+            self._statements[key].observe(stats.statements)
+            for part, seconds in stats.seconds.items():
+                self._parts[key][part].observe(seconds)
+        return response
+
+    def render(self):
+        prefix = self.prefix
+        lines = []
+        with self._lock:
+            name = f"{prefix}_request_duration_seconds"
+            lines += [
+                f"# HELP {name} Request latency per route.",
+                f"# TYPE {name} histogram",
+            ]
+            for (route, method, status), histogram in sorted(self._latency.items()):
+                labels = {"route": route, "method": method, "status": status}
+                lines.extend(histogram.lines(name, labels))
+
+            name = f"{prefix}_request_sql_statements"
+            lines += [
+                f"# HELP {name} SQL statements per request.",
+                f"# TYPE {name} histogram",
+            ]
+            for (route, method), histogram in sorted(self._statements.items()):
+                lines.extend(histogram.lines(name, {"route": route, "method": method}))
+
+            for part in PARTS:
+                name = f"{prefix}_request_{part}_seconds"
+                lines += [
+                    f"# HELP {name} Time per request spent in {part}.",
+                    f"# TYPE {name} histogram",
+                ]
+                for (route, method), parts in sorted(self._parts.items()):
+                    labels = {"route": route, "method": method}
+                    lines.extend(parts[part].lines(name, labels))
+
+        described = set()
+        for collect in self._collectors:
+            for name, kind, help, labels, value in collect():
+                name = f"{prefix}_{name}"
+                if name not in described:
+                    described.add(name)
+                    lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                lines.append(sample(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        return current_app.response_class(
+            self.render(), mimetype="text/plain; version=0.0.4"
+        )
+
+
+class SlowRequestProfiler:
+    """Samples the stacks of running requests, keeps the ones of slow requests.
+
+    A background thread records the stack of every thread serving a request
+    each `interval` seconds. When a request took longer than `threshold`
+    seconds its samples are written to `directory` in the folded format
+    read by flamegraph.pl and speedscope, one file per request.
+    """
+
+    def __init__(self, threshold, directory="profiles", interval=0.005):
+        self.threshold = threshold
+        self.directory = directory
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._sample, name="slow-request-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def _sample(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                thread_ids = list(self._active)
+            if not thread_ids:
+                continue
+            frames = sys._current_frames()
+            stacks = {
+                thread_id: folded_stack(frames[thread_id])
+                for thread_id in thread_ids
+                if thread_id in frames
+            }
+            # a request that ended meanwhile is not in _active anymore
+            with self._lock:
+                for thread_id, stack in stacks.items():
+                    if thread_id in self._active:
+                        self._active[thread_id][stack] += 1
+
+    def _before_request(self):
+        self._start()
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+        g.profile_start = time.perf_counter()
+
+    def _after_request(self, response):
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        elapsed = time.perf_counter() - g.pop("profile_start", time.perf_counter())
+        if samples and elapsed > self.threshold:
+            self.dump(samples, elapsed)
+        return response
+
+    def dump(self, samples, elapsed):
+        os.makedirs(self.directory, exist_ok=True)
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        slug = route.strip("/").replace("/", "_").replace("<", "").replace(">", "")
+        name = "{}-{}ms-{}-{}-{}.folded".format(
+            time.strftime("%Y%m%d-%H%M%S"),
+            int(elapsed * 1000),
+            request.method,
+            slug or "root",
+            os.getpid(),
+        )
+        with open(os.path.join(self.directory, name), "w") as profile:
+            for stack, count in samples.most_common():
+                profile.write(f"{stack} {count}\n")
+
+
+def folded_stack(frame):
+    # "outermost;...;innermost" frames as module:function:line
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        stack.append(f"{module}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
@@ -0,0 +1,83 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENCODERS = ("auto", "orjson", "json")
+DATETIME_FORMATS = ("http", "iso")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider encoding with orjson when it is installed, json otherwise.
+
+    orjson writes dicts, lists, datetimes and the dataclass records of
+    schemas.py in C, without converting them to dicts first. Dates are
+    written in the HTTP format of Flask's provider ("http"), or as ISO 8601
+    ("iso"), which orjson writes natively and is the faster of the two.
+    Keys stay sorted, so both encoders produce the same documents.
+    """
+
+    # orjson writes UTF-8, the json encoder does the same
+    ensure_ascii = False
+
+    def __init__(self, app, encoder="auto", datetime_format="http"):
+        super().__init__(app)
+        if encoder not in ENCODERS:
+            raise ValueError(f"JSON_ENCODER must be one of {', '.join(ENCODERS)}")
+        if datetime_format not in DATETIME_FORMATS:
+            raise ValueError(
+                f"JSON_DATETIME_FORMAT must be one of {', '.join(DATETIME_FORMATS)}"
+            )
+        if encoder == "auto":
+            encoder = "json" if orjson is None else "orjson"
+        elif encoder == "orjson" and orjson is None:
+            raise ValueError("JSON_ENCODER is orjson but orjson is not installed")
+        self.encoder = encoder
+        self.datetime_format = datetime_format
+        if self.encoder == "orjson":
+            self.options = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                self.options |= orjson.OPT_SORT_KEYS
+            if datetime_format == "http":
+                # hand datetimes to default() instead of writing ISO 8601
+                self.options |= orjson.OPT_PASSTHROUGH_DATETIME
+
+    def default(self, o):
+        # what neither encoder writes itself, like Flask's provider does
+        if isinstance(o, date):
+            return http_date(o) if self.datetime_format == "http" else o.isoformat()
+        if isinstance(o, (decimal.Decimal, uuid.UUID)):
+            return str(o)
+        if dataclasses.is_dataclass(o):
+            return {field.name: getattr(o, field.name) for field in dataclasses.fields(o)}
+        if hasattr(o, "__html__"):
+            return str(o.__html__())
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    def dumps(self, obj, **kwargs):
+        if self.encoder == "json":
+            kwargs.setdefault("default", self.default)
+            kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+            kwargs.setdefault("sort_keys", self.sort_keys)
+            kwargs.setdefault("separators", (",", ":"))
+            return json.dumps(obj, **kwargs)
+        # orjson output is always compact, response() asks for separators
+        # out of debug mode and for indent in it
+        options = self.options
+        if kwargs.get("indent"):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=options).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if self.encoder == "json" or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
@@ -0,0 +1,105 @@
+from sqlalchemy import delete, func, insert, select
+
+from extensions import db, upsert
+from models import Menu_Stats, Order, Order_Items, User_Stats
+from stock import order_quantities
+
+
+# Leaderboard
+def record_completed_order(order):
+    # add the order to the menu and member totals
+    quantities = order_quantities(order.order_items)
+    if quantities:
+        menu_stats = Menu_Stats.__table__
+        stmt = upsert(menu_stats).values(
+            # in menu id order, like the menu locks of checkout
+            [
+                {"menu_id": m_id, "quantity": quantities[m_id]}
+                for m_id in sorted(quantities)
+            ]
+        )
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["menu_id"],
+                set_={"quantity": menu_stats.c.quantity + stmt.excluded.quantity},
+            )
+        )
+    if order.user_id is not None:
+        user_stats = User_Stats.__table__
+        stmt = upsert(user_stats).values(
+            user_id=order.user_id, order_count=1, spend=order.total_bill or 0
+        )
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={
+                    "order_count": user_stats.c.order_count + 1,
+                    "spend": user_stats.c.spend + stmt.excluded.spend,
+                },
+            )
+        )
+
+
+# totals computed from the raw order history
+def raw_menu_totals():
+    return (
+        select(Order_Items.menu_id, func.sum(Order_Items.quantity))
+        .join(Order, Order.id == Order_Items.order_id)
+        .where(Order.status == "completed")
+        .group_by(Order_Items.menu_id)
+    )
+
+
+def raw_user_totals():
+    return (
+        select(
+            Order.user_id,
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.total_bill), 0),
+        )
+        .where(Order.status == "completed", Order.user_id.isnot(None))
+        .group_by(Order.user_id)
+    )
+
+
+def rebuild_leaderboard():
+    db.session.execute(delete(Menu_Stats))
+    db.session.execute(delete(User_Stats))
+    db.session.execute(
+        insert(Menu_Stats).from_select(["menu_id", "quantity"], raw_menu_totals())
+    )
+    db.session.execute(
+        insert(User_Stats).from_select(
+            ["user_id", "order_count", "spend"], raw_user_totals()
+        )
+    )
+    db.session.commit()
+
+
+def check_leaderboard():
+    # list every total that differs from the raw order history
+    mismatches = []
+    expected = {m_id: qty for m_id, qty in db.session.execute(raw_menu_totals())}
+    stored = {
+        stats.menu_id: stats.quantity
+        for stats in Menu_Stats.query
+    }
+    for m_id in expected.keys() | stored.keys():
+        if expected.get(m_id) != stored.get(m_id):
+            mismatches.append(
+                f"menu {m_id}: quantity {stored.get(m_id)}, expected {expected.get(m_id)}"
+            )
+    expected = {
+        u_id: (count, spend)
+        for u_id, count, spend in db.session.execute(raw_user_totals())
+    }
+    stored = {
+        stats.user_id: (stats.order_count, stats.spend)
+        for stats in User_Stats.query
+    }
+    for u_id in expected.keys() | stored.keys():
+        if expected.get(u_id) != stored.get(u_id):
+            mismatches.append(
+                f"user {u_id}: (orders, spend) {stored.get(u_id)}, expected {expected.get(u_id)}"
+            )
+    return mismatches
@@ -0,0 +1,129 @@
+from datetime import datetime
+
+from sqlalchemy import case, func, select, update
+
+TOPUP = "topup"
+PAYMENT = "payment"
+REFUND = "refund"
+CREATED = "created"
+COMPLETED = "completed"
+
+# record ids per balance UPDATE of a bulk approval, keeps IN lists bounded
+APPROVAL_BATCH = 5000
+
+# direction of each record type in the running balance
+SIGNS = {TOPUP: 1, REFUND: 1, PAYMENT: -1}
+
+
+class InsufficientBalance(Exception):
+    pass
+
+
+class Ledger:
+    """Balances derived from balance records.
+
+    A record counts once it is completed, and completed records are never
+    changed again. User.balance is the running balance snapshot: it only
+    moves through credit() / debit(), in the transaction that completes
+    the record explaining the change, so reading a balance stays a
+    primary key lookup. reconcile() compares the snapshot with the records.
+    """
+
+    def __init__(self, user_model, record_model):
+        self.user = user_model
+        self.record = record_model
+
+    def credit(self, session, user_id, amount):
+        User = self.user
+        session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(balance=User.balance + amount)
+            .execution_options(synchronize_session="fetch")
+        )
+
+    def debit(self, session, user_id, amount):
+        # UPDATE user SET balance = balance - :a WHERE id = :id AND balance >= :a
+        User = self.user
+        result = session.execute(
+            update(User)
+            .where(User.id == user_id, User.balance >= amount)
+            .values(balance=User.balance - amount)
+            .execution_options(synchronize_session="fetch")
+        )
+        # concurrent debits cannot take the balance below zero
+        if result.rowcount != 1:
+            raise InsufficientBalance()
+
+    def approve_topups(self, session, *criteria):
+        # complete every created top-up matching criteria and credit the
+        # members, returns the (id, user_id, nominal) rows that were approved
+        Record = self.record
+        User = self.user
+
+        # records already completed, also by a concurrent approval, are
+        # skipped by the status condition, so approving twice is harmless
+        approved = session.execute(
+            update(Record)
+            .where(Record.type == TOPUP, Record.status == CREATED, *criteria)
+            .values(status=COMPLETED, completed_date=datetime.now())
+            .returning(Record.id, Record.user_id, Record.nominal)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+        # UPDATE user SET balance = balance + credits.amount
+        # FROM (SELECT user_id, SUM(nominal) ... GROUP BY user_id) AS credits
+        for start in range(0, len(approved), APPROVAL_BATCH):
+            ids = [row.id for row in approved[start : start + APPROVAL_BATCH]]
+            credits = (
+                select(Record.user_id, func.sum(Record.nominal).label("amount"))
+                .where(Record.id.in_(ids))
+                .group_by(Record.user_id)
+                .subquery("credits")
+            )
+            session.execute(
+                update(User)
+                .where(User.id == credits.c.user_id)
+                .values(balance=User.balance + credits.c.amount)
+                .execution_options(synchronize_session=False)
+            )
+        return approved
+
+    def balances(self, session, user_ids=None):
+        # {user_id: balance} summed from the completed records
+        Record = self.record
+        signed = case(SIGNS, value=Record.type, else_=0) * Record.nominal
+        query = (
+            select(Record.user_id, func.coalesce(func.sum(signed), 0))
+            .where(Record.status == COMPLETED)
+            .group_by(Record.user_id)
+        )
+        if user_ids is not None:
+            query = query.where(Record.user_id.in_(user_ids))
+        return {user_id: int(total) for user_id, total in session.execute(query)}
+
+    def reconcile(self, session, fix=False):
+        # [(user_id, snapshot, expected)] of users whose snapshot drifted,
+        # with fix=True their snapshot is reset from the records
+        User = self.user
+        expected = self.balances(session)
+        drifted = [
+            (user_id, balance, expected.get(user_id, 0))
+            for user_id, balance in session.execute(select(User.id, User.balance))
+            if balance != expected.get(user_id, 0)
+        ]
+        if fix and drifted:
+            user_ids = [user_id for user_id, _, _ in drifted]
+            # lock the rows, then recompute so concurrent postings are included
+            session.execute(
+                select(User.id).where(User.id.in_(user_ids)).with_for_update()
+            )
+            recomputed = self.balances(session, user_ids)
+            for user_id in user_ids:
+                session.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(balance=recomputed.get(user_id, 0))
+                    .execution_options(synchronize_session="fetch")
+                )
+        return drifted
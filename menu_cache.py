@@ -0,0 +1,40 @@
+import hashlib
+import threading
+import time
+
+
+class CatalogueCache:
+    """In-process cache of encoded menu responses with their ETag.
+
+    Writes in this process call invalidate(). Other worker processes only
+    notice a change once their entries expire, so ttl bounds staleness.
+    """
+
+    def __init__(self, ttl=5):
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # return (etag, body) of a cached response, or None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        etag, body, expires_at = entry
+        if expires_at < time.monotonic():
+            return None
+        return etag, body
+
+    def set(self, key, body, generation):
+        # a response built before the last invalidate() is served but not kept
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = (etag, body, time.monotonic() + self.ttl)
+        return etag, body
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
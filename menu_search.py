@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import text
+
+WORD = re.compile(r"\w+")
+
+# weight of a match in the menu name compared to one in the description
+NAME_WEIGHT = 2.0
+DESC_WEIGHT = 1.0
+
+# score factor of exact, prefix and typo-tolerant matches
+EXACT = 1.0
+PREFIX = 0.8
+FUZZY = 0.6
+
+# same default as pg_trgm.similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+
+def trigrams(word):
+    # padded like pg_trgm, so short words and word starts still match
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def has_pg_trgm(session):
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(
+        session.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).scalar()
+    )
+
+
+class InvertedIndex:
+    """In-process menu search used when pg_trgm is not available.
+
+    Words of the menu name and description are indexed; a search term
+    matches a word exactly, as a prefix, or by trigram similarity. Every
+    term of the keyword must match. Stock is not kept here, the caller
+    filters the ranked ids in SQL.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._postings = {}
+        self._words = []
+        self._grams = {}
+        self._gram_counts = {}
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    def is_stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at > self.ttl
+
+    def invalidate(self):
+        self._built_at = None
+
+    def build(self, rows):
+        # rows of (menu_id, name, desc)
+        postings = {}
+        for menu_id, name, desc in rows:
+            for words, weight in ((desc, DESC_WEIGHT), (name, NAME_WEIGHT)):
+                for word in WORD.findall(words.lower()):
+                    entry = postings.setdefault(word, {})
+                    entry[menu_id] = max(entry.get(menu_id, 0), weight)
+        grams = {}
+        gram_counts = {}
+        for word in postings:
+            word_grams = trigrams(word)
+            gram_counts[word] = len(word_grams)
+            for gram in word_grams:
+                grams.setdefault(gram, []).append(word)
+        with self._lock:
+            self._postings = postings
+            self._words = sorted(postings)
+            self._grams = grams
+            self._gram_counts = gram_counts
+            self._built_at = time.monotonic()
+
+    def _matches(self, term):
+        # {word: factor} of indexed words matching one search term
+        matches = {}
+        if term in self._postings:
+            matches[term] = EXACT
+
+        start = bisect_left(self._words, term)
+        for word in self._words[start : start + 50]:
+            if not word.startswith(term):
+                break
+            matches.setdefault(word, PREFIX)
+
+        if len(term) >= 3:
+            term_grams = trigrams(term)
+            shared = {}
+            for gram in term_grams:
+                for word in self._grams.get(gram, ()):
+                    shared[word] = shared.get(word, 0) + 1
+            for word, count in shared.items():
+                similarity = count / (len(term_grams) + self._gram_counts[word] - count)
+                if similarity >= SIMILARITY_THRESHOLD:
+                    factor = FUZZY * similarity
+                    if factor > matches.get(word, 0):
+                        matches[word] = factor
+        return matches
+
+    def search(self, keyword):
+        # menu ids ranked by relevance, best first
+        scores = None
+        for term in WORD.findall(keyword.lower()):
+            term_scores = {}
+            for word, factor in self._matches(term).items():
+                for menu_id, weight in self._postings[word].items():
+                    score = factor * weight
+                    if score > term_scores.get(menu_id, 0):
+                        term_scores[menu_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    menu_id: scores[menu_id] + score
+                    for menu_id, score in term_scores.items()
+                    if menu_id in scores
+                }
+        if not scores:
+            return []
+        return sorted(scores, key=lambda menu_id: (-scores[menu_id], menu_id))
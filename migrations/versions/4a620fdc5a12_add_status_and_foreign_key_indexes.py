@@ -0,0 +1,55 @@
+"""add status and foreign key indexes
+
+Revision ID: 4a620fdc5a12
+Revises: 7d364d2c585c
+Create Date: 2026-10-18 12:26:53.771042
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a620fdc5a12'
+down_revision = '7d364d2c585c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the primary keys are already indexed
+    for table in ['user', 'order', 'order_items', 'balance_record', 'menu']:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_id'))
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.create_index('ix_order_status_created_date', ['status', 'created_date'], unique=False)
+        batch_op.create_index('ix_order_user_id_status', ['user_id', 'status'], unique=False)
+        batch_op.create_index('ix_order_in_process_created_date', ['created_date', 'id'], unique=False, postgresql_where=sa.text("status = 'in-process'"), sqlite_where=sa.text("status = 'in-process'"))
+        batch_op.create_index('ix_order_waiting_list_created_date', ['created_date', 'id'], unique=False, postgresql_where=sa.text("status = 'waiting-list'"), sqlite_where=sa.text("status = 'waiting-list'"))
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_items_menu_id'), ['menu_id'], unique=False)
+
+    with op.batch_alter_table('balance_record', schema=None) as batch_op:
+        batch_op.create_index('ix_balance_record_type_status', ['type', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('balance_record', schema=None) as batch_op:
+        batch_op.drop_index('ix_balance_record_type_status')
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_menu_id'))
+        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_waiting_list_created_date')
+        batch_op.drop_index('ix_order_in_process_created_date')
+        batch_op.drop_index('ix_order_user_id_status')
+        batch_op.drop_index('ix_order_status_created_date')
+
+    for table in ['user', 'order', 'order_items', 'balance_record', 'menu']:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(batch_op.f(f'ix_{table}_id'), ['id'], unique=False)
@@ -0,0 +1,36 @@
+"""add user_id status index in balance_record
+
+Revision ID: 60658d6a514d
+Revises: deada4fc27d8
+Create Date: 2026-10-18 05:19:01.982607
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '60658d6a514d'
+down_revision = 'deada4fc27d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('balance_record', schema=None) as batch_op:
+        batch_op.create_index('ix_balance_record_user_id_status', ['user_id', 'status'], unique=False)
+
+    # refunds were recorded as 80% of the bill while the whole bill was
+    # given back, record what was actually refunded (not undone on downgrade)
+    op.execute(
+        """
+        UPDATE balance_record
+        SET nominal = (SELECT total_bill FROM "order" WHERE "order".id = balance_record.order_id)
+        WHERE type = 'refund' AND order_id IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('balance_record', schema=None) as batch_op:
+        batch_op.drop_index('ix_balance_record_user_id_status')
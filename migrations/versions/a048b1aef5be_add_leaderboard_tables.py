@@ -0,0 +1,70 @@
+"""add leaderboard tables
+
+Revision ID: a048b1aef5be
+Revises: da989ea91351
+Create Date: 2026-10-18 10:12:41.530918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a048b1aef5be'
+down_revision = 'da989ea91351'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('menu_stats',
+    sa.Column('menu_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_id'], ['menu.id'], ),
+    sa.PrimaryKeyConstraint('menu_id')
+    )
+    with op.batch_alter_table('menu_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_menu_stats_quantity'), ['quantity'], unique=False)
+
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('spend', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_stats_order_count'), ['order_count'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_stats_spend'), ['spend'], unique=False)
+
+    # fill the tables from the existing order history
+    op.execute(
+        """
+        INSERT INTO menu_stats (menu_id, quantity)
+        SELECT order_items.menu_id, SUM(order_items.quantity)
+        FROM order_items JOIN "order" ON "order".id = order_items.order_id
+        WHERE "order".status = 'completed'
+        GROUP BY order_items.menu_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_stats (user_id, order_count, spend)
+        SELECT user_id, COUNT(id), COALESCE(SUM(total_bill), 0)
+        FROM "order"
+        WHERE status = 'completed' AND user_id IS NOT NULL
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_stats_spend'))
+        batch_op.drop_index(batch_op.f('ix_user_stats_order_count'))
+
+    op.drop_table('user_stats')
+    with op.batch_alter_table('menu_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_menu_stats_quantity'))
+
+    op.drop_table('menu_stats')
@@ -0,0 +1,33 @@
+"""add pending topup index in balance_record
+
+Revision ID: a337a271254a
+Revises: 60658d6a514d
+Create Date: 2026-10-18 05:21:52.841539
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a337a271254a'
+down_revision = '60658d6a514d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the pending queue is paginated by (created_date, id)
+    op.execute(
+        """
+        UPDATE balance_record SET created_date = CURRENT_TIMESTAMP
+        WHERE type = 'topup' AND status = 'created' AND created_date IS NULL
+        """
+    )
+    with op.batch_alter_table('balance_record', schema=None) as batch_op:
+        batch_op.create_index('ix_balance_record_pending_topup_created_date', ['created_date', 'id'], unique=False, postgresql_where=sa.text("type = 'topup' AND status = 'created'"), sqlite_where=sa.text("type = 'topup' AND status = 'created'"))
+
+
+def downgrade():
+    with op.batch_alter_table('balance_record', schema=None) as batch_op:
+        batch_op.drop_index('ix_balance_record_pending_topup_created_date', postgresql_where=sa.text("type = 'topup' AND status = 'created'"), sqlite_where=sa.text("type = 'topup' AND status = 'created'"))
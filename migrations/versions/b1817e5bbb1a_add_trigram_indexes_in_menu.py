@@ -0,0 +1,61 @@
+"""add trigram indexes in menu
+
+Revision ID: b1817e5bbb1a
+Revises: 4a620fdc5a12
+Create Date: 2026-10-18 13:41:09.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1817e5bbb1a'
+down_revision = '4a620fdc5a12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('menu', schema=None) as batch_op:
+            batch_op.create_index('ix_menu_name_trgm', ['name'], unique=False)
+            batch_op.create_index('ix_menu_desc_trgm', ['desc'], unique=False)
+        return
+
+    # pg_trgm needs a privileged role, without it /menu/search falls back to
+    # its in-process index and the trigram indexes are skipped
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        EXCEPTION WHEN insufficient_privilege OR undefined_file THEN
+            RAISE NOTICE 'pg_trgm is not available';
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                CREATE INDEX IF NOT EXISTS ix_menu_name_trgm ON menu USING gin (name gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS ix_menu_desc_trgm ON menu USING gin ("desc" gin_trgm_ops);
+            END IF;
+        END
+        $$
+        """
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('menu', schema=None) as batch_op:
+            batch_op.drop_index('ix_menu_desc_trgm')
+            batch_op.drop_index('ix_menu_name_trgm')
+        return
+
+    op.execute('DROP INDEX IF EXISTS ix_menu_desc_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_menu_name_trgm')
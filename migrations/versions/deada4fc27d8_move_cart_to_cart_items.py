@@ -0,0 +1,98 @@
+"""move cart to cart_items
+
+Revision ID: deada4fc27d8
+Revises: b1817e5bbb1a
+Create Date: 2026-10-18 05:17:21.816133
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'deada4fc27d8'
+down_revision = 'b1817e5bbb1a'
+branch_labels = None
+depends_on = None
+
+user = sa.table('user', sa.column('id', sa.Integer), sa.column('cart', sa.String))
+menu = sa.table('menu', sa.column('id', sa.Integer))
+cart_items = sa.table(
+    'cart_items',
+    sa.column('user_id', sa.Integer),
+    sa.column('menu_id', sa.Integer),
+    sa.column('quantity', sa.SmallInteger),
+)
+
+
+def blob_quantities(blob):
+    # {menu_id: quantity} of a {"cartData": [...]} blob, unreadable lines are skipped
+    try:
+        lines = json.loads(blob)["cartData"]
+    except (TypeError, ValueError, KeyError):
+        return {}
+    quantities = {}
+    for line in lines if isinstance(lines, list) else []:
+        if not isinstance(line, dict):
+            continue
+        menu_id = line.get('menu_id', line.get('id'))
+        quantity = line.get('quantity', line.get('qty'))
+        if all(
+            isinstance(value, int) and not isinstance(value, bool) and value > 0
+            for value in (menu_id, quantity)
+        ):
+            quantities[menu_id] = quantities.get(menu_id, 0) + quantity
+    return quantities
+
+
+def upgrade():
+    op.create_table('cart_items',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('menu_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.SmallInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_id'], ['menu.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'menu_id')
+    )
+
+    # move the JSON blobs over, lines of deleted menus are dropped
+    connection = op.get_bind()
+    menu_ids = set(connection.scalars(sa.select(menu.c.id)))
+    rows = connection.execute(
+        sa.select(user.c.id, user.c.cart).where(user.c.cart.is_not(None))
+    ).all()
+    lines = [
+        {'user_id': user_id, 'menu_id': menu_id, 'quantity': quantity}
+        for user_id, blob in rows
+        for menu_id, quantity in blob_quantities(blob).items()
+        if menu_id in menu_ids
+    ]
+    for start in range(0, len(lines), 1000):
+        connection.execute(cart_items.insert(), lines[start : start + 1000])
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('cart')
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cart', sa.VARCHAR(), nullable=True))
+
+    # rebuild the blobs, every user gets one like /user/register used to create
+    connection = op.get_bind()
+    carts = {}
+    for user_id, menu_id, quantity in connection.execute(
+        sa.select(cart_items.c.user_id, cart_items.c.menu_id, cart_items.c.quantity)
+    ):
+        carts.setdefault(user_id, []).append({'menu_id': menu_id, 'quantity': quantity})
+    connection.execute(user.update().values(cart=json.dumps({'cartData': []})))
+    for user_id, lines in carts.items():
+        connection.execute(
+            user.update()
+            .where(user.c.id == user_id)
+            .values(cart=json.dumps({'cartData': lines}))
+        )
+
+    op.drop_table('cart_items')
@@ -0,0 +1,167 @@
+from extensions import db
+from ledger import Ledger
+
+
+# Model of Tables and Relationships
+class User(db.Model):
+    __tablename__ = "user"
+
+    id = db.Column(db.Integer, autoincrement=True, primary_key=True)
+    name = db.Column(db.String, nullable=False)
+    email = db.Column(db.String, nullable=False, unique=True)
+    password = db.Column(db.String, nullable=False)
+    balance = db.Column(db.Integer, nullable=False, default=0)
+    role = db.Column(db.String, nullable=False)
+
+    def __repr__(self):
+        return f"<User {self.id}>"
+
+
+class Order(db.Model):
+    __tablename__ = "order"
+
+    id = db.Column(db.Integer, autoincrement=True, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
+    customer_name = db.Column(db.String, nullable=False)
+    total_bill = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String, nullable=False)
+    created_date = db.Column(db.DateTime, nullable=False)
+    completed_date = db.Column(db.DateTime, nullable=True)
+    cancelled_date = db.Column(db.DateTime, nullable=True)
+    order_items = db.relationship("Order_Items", backref="order")
+
+    __table_args__ = (
+        db.Index("ix_order_created_date_id", "created_date", "id"),
+        db.Index("ix_order_status_created_date", "status", "created_date"),
+        db.Index("ix_order_user_id_status", "user_id", "status"),
+        # the order queue only ever looks at these two statuses
+        db.Index(
+            "ix_order_in_process_created_date",
+            "created_date",
+            "id",
+            postgresql_where=db.text("status = 'in-process'"),
+            sqlite_where=db.text("status = 'in-process'"),
+        ),
+        db.Index(
+            "ix_order_waiting_list_created_date",
+            "created_date",
+            "id",
+            postgresql_where=db.text("status = 'waiting-list'"),
+            sqlite_where=db.text("status = 'waiting-list'"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Order {self.id}>"
+
+
+class Order_Items(db.Model):
+    __tablename__ = "order_items"
+    id = db.Column(db.Integer, autoincrement=True, primary_key=True)
+    order_id = db.Column(
+        db.Integer, db.ForeignKey("order.id"), nullable=False, index=True
+    )
+    menu_id = db.Column(db.Integer, db.ForeignKey("menu.id"), nullable=False, index=True)
+    menu_name = db.Column(db.String, nullable=False)
+    quantity = db.Column(db.SmallInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<Item(Qty) {self.menu_name}({self.quantity})>"
+
+
+class Menu(db.Model):
+    __tablename__ = "menu"
+
+    id = db.Column(db.Integer, autoincrement=True, primary_key=True)
+    name = db.Column(db.String, nullable=False)
+    desc = db.Column(db.String, nullable=False)
+    price = db.Column(db.Integer, nullable=False)
+    stock = db.Column(db.SmallInteger, nullable=False)
+    img_url = db.Column(db.String, nullable=False)
+    category = db.Column(db.String, nullable=False)
+
+    # trigram indexes serving /menu/search, created only when pg_trgm exists
+    __table_args__ = (
+        db.Index(
+            "ix_menu_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        db.Index(
+            "ix_menu_desc_trgm",
+            "desc",
+            postgresql_using="gin",
+            postgresql_ops={"desc": "gin_trgm_ops"},
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Menu {self.id}>"
+
+
+class Balance_Record(db.Model):
+    __tablename__ = "balance_record"
+
+    id = db.Column(db.Integer, autoincrement=True, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    member_name = db.Column(db.String, nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=True)
+    nominal = db.Column(db.Integer, nullable=False)
+    created_date = db.Column(db.DateTime, nullable=True)
+    completed_date = db.Column(db.DateTime, nullable=True)
+    status = db.Column(db.String, nullable=False)
+    type = db.Column(db.String, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_balance_record_type_status", "type", "status"),
+        db.Index("ix_balance_record_user_id_status", "user_id", "status"),
+        # the pending top-up queue, stays small however many records exist
+        db.Index(
+            "ix_balance_record_pending_topup_created_date",
+            "created_date",
+            "id",
+            postgresql_where=db.text("type = 'topup' AND status = 'created'"),
+            sqlite_where=db.text("type = 'topup' AND status = 'created'"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Transaction {self.id}>"
+
+
+# Leaderboard aggregates, updated when an order is completed
+class Menu_Stats(db.Model):
+    __tablename__ = "menu_stats"
+
+    menu_id = db.Column(db.Integer, db.ForeignKey("menu.id"), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+    def __repr__(self):
+        return f"<Menu_Stats {self.menu_id}>"
+
+
+class User_Stats(db.Model):
+    __tablename__ = "user_stats"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    spend = db.Column(db.BigInteger, nullable=False, default=0, index=True)
+
+    def __repr__(self):
+        return f"<User_Stats {self.user_id}>"
+
+
+# one row per menu in a member's cart
+class Cart_Items(db.Model):
+    __tablename__ = "cart_items"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    menu_id = db.Column(db.Integer, db.ForeignKey("menu.id"), primary_key=True)
+    quantity = db.Column(db.SmallInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<Cart_Items {self.user_id}:{self.menu_id}>"
+
+
+ledger = Ledger(User, Balance_Record)
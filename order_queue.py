@@ -0,0 +1,73 @@
+from sqlalchemy import func, select, text, tuple_
+
+IN_PROCESS = "in-process"
+WAITING_LIST = "waiting-list"
+
+# arbitrary key of the Postgres advisory lock guarding queue transitions
+QUEUE_LOCK_KEY = 7291
+
+
+class OrderQueue:
+    """In-process / waiting-list bookkeeping of orders.
+
+    At most `capacity` orders are in process, the others wait in
+    created_date order and are promoted as in-process orders complete.
+    """
+
+    def __init__(self, order_model, capacity=10):
+        self.order = order_model
+        self.capacity = capacity
+
+    def lock(self, session):
+        # serialize admissions and promotions until the transaction ends,
+        # SQLite already serializes writers
+        if session.get_bind().dialect.name == "postgresql":
+            session.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": QUEUE_LOCK_KEY}
+            )
+
+    def active_count(self, session):
+        # never reads more than `capacity` index entries
+        Order = self.order
+        active = (
+            select(Order.id)
+            .where(Order.status == IN_PROCESS)
+            .limit(self.capacity)
+            .subquery()
+        )
+        return session.execute(select(func.count()).select_from(active)).scalar()
+
+    def admit_status(self, session):
+        if self.active_count(session) < self.capacity:
+            return IN_PROCESS
+        return WAITING_LIST
+
+    def position(self, session, order):
+        # 1-based number of the order among orders with the same status
+        Order = self.order
+        ahead = session.execute(
+            select(func.count(Order.id)).where(
+                Order.status == order.status,
+                tuple_(Order.created_date, Order.id)
+                < tuple_(order.created_date, order.id),
+            )
+        ).scalar()
+        return ahead + 1
+
+    def promote(self, session):
+        # fill free slots with the oldest waiting orders, rows locked by a
+        # concurrent promotion are skipped instead of waited on
+        Order = self.order
+        free_slots = self.capacity - self.active_count(session)
+        if free_slots <= 0:
+            return []
+        waiting = session.scalars(
+            select(Order)
+            .where(Order.status == WAITING_LIST)
+            .order_by(Order.created_date, Order.id)
+            .limit(free_slots)
+            .with_for_update(skip_locked=True)
+        ).all()
+        for order in waiting:
+            order.status = IN_PROCESS
+        return waiting
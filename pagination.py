@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+# rows counted exactly when the planner cannot be asked for an estimate
+EXACT_COUNT_LIMIT = 10000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# Keyset cursors point at the last (created_date, id) pair of a page
+
+
+def encode_cursor(created_date, row_id):
+    raw = json.dumps([created_date.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_date, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_date), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def page_limit(args, default=100, maximum=1000):
+    try:
+        limit = int(args.get("limit", default))
+    except ValueError:
+        return default
+    return max(1, min(limit, maximum))
+
+
+def count_estimate(session, query):
+    # rows `query` would return without LIMIT: the Postgres planner estimate,
+    # elsewhere an exact count that stops at EXACT_COUNT_LIMIT
+    bind = session.get_bind()
+    if bind.dialect.name == "postgresql":
+        compiled = query.compile(
+            dialect=bind.dialect, compile_kwargs={"render_postcompile": True}
+        )
+        plan = session.connection().exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+        ).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+    capped = query.limit(EXACT_COUNT_LIMIT).subquery()
+    return session.execute(select(func.count()).select_from(capped)).scalar()
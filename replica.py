@@ -0,0 +1,101 @@
+import itertools
+import threading
+import time
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+# seconds the replica is behind the primary, 0 when it has replayed
+# everything it received (an idle primary sends nothing to replay)
+POSTGRES_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+def replica_binds(urls, options):
+    # SQLALCHEMY_BINDS entries of the replicas, options(url) gives engine options
+    return {f"replica_{i}": {"url": url, **options(url)} for i, url in enumerate(urls)}
+
+
+def replica_lag(engine):
+    # also raises when the replica is unreachable
+    with engine.connect() as connection:
+        if engine.dialect.name != "postgresql":
+            connection.execute(text("SELECT 1"))
+            return 0.0
+        return float(connection.execute(POSTGRES_LAG).scalar())
+
+
+class RoutingSession(Session):
+    """Session sending reads of a read_replica view to the replica in g.replica.
+
+    Everything else, including any flush, goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            replica = g.get("replica")
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Picks a healthy replica engine for read-only views, round-robin.
+
+    A replica is skipped while it is unreachable or more than
+    `max_staleness` seconds behind the primary. Health is checked at most
+    once every `check_interval` seconds per replica.
+    """
+
+    def __init__(self, db, bind_keys, max_staleness=5, check_interval=1):
+        self.db = db
+        self.bind_keys = list(bind_keys)
+        self.max_staleness = max_staleness
+        self.check_interval = check_interval
+        self._health = {}
+        self._order = itertools.cycle(self.bind_keys)
+        self._lock = threading.Lock()
+
+    def _check(self, key):
+        # (healthy, lag) of a replica, refreshed after check_interval
+        now = time.monotonic()
+        entry = self._health.get(key)
+        if entry is not None and now - entry[2] < self.check_interval:
+            return entry[0], entry[1]
+        try:
+            lag = replica_lag(self.db.engines[key])
+            healthy = lag <= self.max_staleness
+        except Exception:
+            lag, healthy = None, False
+        self._health[key] = (healthy, lag, now)
+        return healthy, lag
+
+    def choose(self):
+        # (bind key, engine) of a healthy replica, or None to use the primary
+        if not self.bind_keys:
+            return None
+        with self._lock:
+            keys = [next(self._order) for _ in self.bind_keys]
+        for key in keys:
+            healthy, _ = self._check(key)
+            if healthy:
+                return key, self.db.engines[key]
+        return None
+
+    def mark_down(self, key):
+        self._health[key] = (False, None, time.monotonic())
+
+    def status(self):
+        return [
+            {"bind": key, "healthy": healthy, "lag_seconds": lag}
+            for key in self.bind_keys
+            for healthy, lag in [self._check(key)]
+        ]
@@ -161,81 +161,81 @@ menus = [
     },
     {
         "name": "Pour Over",
-        "description": "A manual coffee brewing method where hot water is poured over ground coffee in a filter, resulting in a clean and flavorful cup.",
+        "desc": "A manual coffee brewing method where hot water is poured over ground coffee in a filter, resulting in a clean and flavorful cup.",
         "price": 35000,
-        "image_url": "https://example.com/pour_over.jpg",
+        "img_url": "https://example.com/pour_over.jpg",
         "stock": 20,
         "category": "drinks",
     },
     {
         "name": "Turkish Coffee",
-        "description": "A strong coffee prepared by simmering finely ground coffee beans in a special pot called a cezve, often served with a side of Turkish delight.",
+        "desc": "A strong coffee prepared by simmering finely ground coffee beans in a special pot called a cezve, often served with a side of Turkish delight.",
         "price": 40000,
-        "image_url": "https://example.com/turkish_coffee.jpg",
+        "img_url": "https://example.com/turkish_coffee.jpg",
         "stock": 15,
         "category": "drinks",
     },
     {
         "name": "Vietnamese Iced Coffee",
-        "description": "Also known as Ca Phe Da, this coffee is made with dark roast coffee, sweetened condensed milk, and served over ice.",
+        "desc": "Also known as Ca Phe Da, this coffee is made with dark roast coffee, sweetened condensed milk, and served over ice.",
         "price": 45000,
-        "image_url": "https://example.com/vietnamese_iced_coffee.jpg",
+        "img_url": "https://example.com/vietnamese_iced_coffee.jpg",
         "stock": 12,
         "category": "drinks",
     },
     {
         "name": "Caramel Macchiato",
-        "description": "A delicious combination of espresso, steamed milk, vanilla syrup, and caramel sauce, topped with foam and drizzled caramel.",
+        "desc": "A delicious combination of espresso, steamed milk, vanilla syrup, and caramel sauce, topped with foam and drizzled caramel.",
         "price": 38000,
-        "image_url": "https://example.com/caramel_macchiato.jpg",
+        "img_url": "https://example.com/caramel_macchiato.jpg",
         "stock": 18,
         "category": "drinks",
     },
     {
         "name": "Iced Matcha Latte",
-        "description": "A refreshing and creamy drink made with powdered green tea, milk, and sweetener, served over ice.",
+        "desc": "A refreshing and creamy drink made with powdered green tea, milk, and sweetener, served over ice.",
         "price": 42000,
-        "image_url": "https://example.com/iced_matcha_latte.jpg",
+        "img_url": "https://example.com/iced_matcha_latte.jpg",
         "stock": 16,
         "category": "drinks",
     },
     {
         "name": "Batagor",
-        "description": "Short for Bakso Tahu Goreng, batagor is a popular Bandung street food consisting of fried fish dumplings and tofu, served with a peanut sauce.",
+        "desc": "Short for Bakso Tahu Goreng, batagor is a popular Bandung street food consisting of fried fish dumplings and tofu, served with a peanut sauce.",
         "price": 35000,
-        "image_url": "https://example.com/batagor.jpg",
+        "img_url": "https://example.com/batagor.jpg",
         "stock": 18,
         "category": "foods",
     },
     {
         "name": "Cireng",
-        "description": "A beloved Bandung snack, cireng is a deep-fried tapioca-based snack served with a chili dipping sauce.",
+        "desc": "A beloved Bandung snack, cireng is a deep-fried tapioca-based snack served with a chili dipping sauce.",
         "price": 25000,
-        "image_url": "https://example.com/cireng.jpg",
+        "img_url": "https://example.com/cireng.jpg",
         "stock": 25,
         "category": "foods",
     },
     {
         "name": "Pisang Molen",
-        "description": "Pisang Molen is a popular snack in Bandung made from crispy pastry filled with sweetened banana filling. It's a delightful combination of crunchy and sweet flavors.",
+        "desc": "Pisang Molen is a popular snack in Bandung made from crispy pastry filled with sweetened banana filling. It's a delightful combination of crunchy and sweet flavors.",
         "price": 25000,
-        "image_url": "https://example.com/pisang_molen.jpg",
+        "img_url": "https://example.com/pisang_molen.jpg",
         "stock": 25,
         "category": "foods",
     },
     {
         "name": "Cilok Bandung",
-        "description": "Cilok is a beloved Bandung street snack made from tapioca flour. These chewy balls are often served with a spicy peanut sauce, resulting in a delightful combination of textures and flavors.",
+        "desc": "Cilok is a beloved Bandung street snack made from tapioca flour. These chewy balls are often served with a spicy peanut sauce, resulting in a delightful combination of textures and flavors.",
         "price": 18000,
-        "image_url": "https://example.com/cilok_bandung.jpg",
+        "img_url": "https://example.com/cilok_bandung.jpg",
         "stock": 30,
         "category": "foods",
     },
     {
         "name": "Baso Tahu Goreng",
-        "description": "Baso Tahu Goreng is a popular Bandung snack consisting of deep-fried tofu filled with a mixture of meatball (baso) and vegetables. It is commonly enjoyed with a tangy and savory sauce.",
+        "desc": "Baso Tahu Goreng is a popular Bandung snack consisting of deep-fried tofu filled with a mixture of meatball (baso) and vegetables. It is commonly enjoyed with a tangy and savory sauce.",
         "price": 30000,
-        "image_url": "https://example.com/baso_tahu_goreng.jpg",
+        "img_url": "https://example.com/baso_tahu_goreng.jpg",
         "stock": 20,
         "category": "foods",
     },
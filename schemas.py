@@ -0,0 +1,83 @@
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+
+# Response records, written by the JSON provider (json_provider.py) field by
+# field, orjson does so without building a dict per row. Fields are declared
+# in sorted order, the order the provider writes dict keys in. No __slots__:
+# orjson reads the fields of a dataclass from its __dict__, several times
+# faster than through slots.
+#
+# The list routes select just these columns (project) and map the rows to
+# records (fetch): no ORM entity is built, nothing enters the identity map.
+
+
+def columns(schema, model):
+    # the model columns of a schema named like them, in field order, so
+    # schema(*row) builds a record from each selected row
+    return [getattr(model, field.name) for field in fields(schema)]
+
+
+def records(schema, rows):
+    return [schema(*row) for row in rows]
+
+
+def project(schema, model):
+    # SELECT of the schema's columns, add where / order_by / limit to it
+    return select(*columns(schema, model))
+
+
+def fetch(session, schema, statement):
+    return records(schema, session.execute(statement))
+
+
+# a row of /orders/all
+@dataclass
+class OrderRow:
+    created_date: datetime
+    customer_name: str
+    id: int
+    status: str
+    total_bill: Optional[int]
+
+
+# a menu of /menu/available
+@dataclass
+class MenuCard:
+    desc: str
+    id: int
+    img_url: str
+    name: str
+    price: int
+    stock: int
+
+
+# a row of /menu/all
+@dataclass
+class MenuRow:
+    category: str
+    id: int
+    name: str
+    price: int
+    stock: int
+
+
+# a row of /menu/lowstock
+@dataclass
+class StockRow:
+    name: str
+    price: int
+    stock: int
+
+
+# a row of /users/all
+@dataclass
+class UserRow:
+    balance: int
+    email: str
+    id: int
+    name: str
+    password: str
+    role: str
@@ -0,0 +1,49 @@
+from sqlalchemy import case, update
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+# Stock follows the order lifecycle:
+#   reserve  - order created, stock is taken in the same transaction
+#   commit   - order completed, the reserved stock is simply kept
+#   release  - order cancelled, the reserved stock is given back
+#
+# quantities is a {menu_id: quantity} dict, each phase is a single UPDATE
+# so a cart costs one round trip whatever its size.
+
+
+def reserve_stock(session, menu_table, quantities):
+    if not quantities:
+        return
+    needed = case(quantities, value=menu_table.c.id)
+
+    # UPDATE menu SET stock = stock - :q WHERE id = :id AND stock >= :q
+    result = session.execute(
+        update(menu_table)
+        .where(menu_table.c.id.in_(quantities), menu_table.c.stock >= needed)
+        .values(stock=menu_table.c.stock - needed)
+    )
+
+    # a row that would go below zero is not updated, the caller rolls back
+    if result.rowcount != len(quantities):
+        raise InsufficientStock()
+
+
+def release_stock(session, menu_table, quantities):
+    if not quantities:
+        return
+    returned = case(quantities, value=menu_table.c.id)
+    session.execute(
+        update(menu_table)
+        .where(menu_table.c.id.in_(quantities))
+        .values(stock=menu_table.c.stock + returned)
+    )
+
+
+def order_quantities(order_items):
+    quantities = {}
+    for item in order_items:
+        quantities[item.menu_id] = quantities.get(item.menu_id, 0) + item.quantity
+    return quantities
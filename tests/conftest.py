@@ -0,0 +1,105 @@
+from base64 import b64encode
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from extensions import db, password_hasher
+from models import Menu, User
+
+PASSWORD = "password"
+ADMIN_EMAIL = "admin@example.com"
+MEMBER_EMAIL = "member@example.com"
+
+
+# an app on its own in-memory SQLite database, the configured one is not used
+@pytest.fixture
+def app():
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite://",
+            "PASSWORD_HASH_WORKERS": 0,
+            "PASSWORD_HASH_ROUNDS": 4,
+            "TESTING": True,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# an admin and a member with a large balance, both logging in with PASSWORD
+@pytest.fixture
+def users(app):
+    with app.app_context():
+        hashed = password_hasher.hash(PASSWORD)
+        db.session.add_all(
+            [
+                User(name="Admin", email=ADMIN_EMAIL, password=hashed, role="admin"),
+                User(
+                    name="Member",
+                    email=MEMBER_EMAIL,
+                    password=hashed,
+                    balance=10**9,
+                    role="member",
+                ),
+            ]
+        )
+        db.session.commit()
+
+
+# ids of 20 menus with plenty of stock
+@pytest.fixture
+def menu_ids(app):
+    with app.app_context():
+        menus = [
+            Menu(
+                name=f"Menu {n}",
+                desc="-",
+                price=1000,
+                stock=1000,
+                img_url="-",
+                category="drinks" if n % 2 else "foods",
+            )
+            for n in range(20)
+        ]
+        db.session.add_all(menus)
+        db.session.commit()
+        return [menu.id for menu in menus]
+
+
+def basic(email):
+    token = b64encode(f"{email}:{PASSWORD}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+
+# count_statements(request) runs request() and returns the number of
+# statements the database received, an executemany counting once
+@pytest.fixture
+def count_statements(app):
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    def count(request):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", capture)
+        try:
+            request()
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", capture)
+        return len(statements)
+
+    return count
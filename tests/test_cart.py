@@ -0,0 +1,24 @@
+import pytest
+
+from conftest import MEMBER_EMAIL, basic
+
+pytestmark = pytest.mark.usefixtures("users")
+
+
+@pytest.mark.parametrize("menu_id", [True, [1], {"id": 1}, "1", 0])
+def test_menu_id_must_be_a_positive_int(client, menu_ids, menu_id):
+    response = client.post(
+        "/cart/items", headers=basic(MEMBER_EMAIL), json={"menu_id": menu_id}
+    )
+    assert response.status_code == 404
+    assert client.get("/cart", headers=basic(MEMBER_EMAIL)).json["data"]["cart"] == []
+
+
+def test_add_to_cart(client, menu_ids):
+    response = client.post(
+        "/cart/items",
+        headers=basic(MEMBER_EMAIL),
+        json={"menu_id": menu_ids[0], "quantity": 2},
+    )
+    assert response.status_code == 201
+    assert response.json["data"]["total"] == 2000
@@ -0,0 +1,19 @@
+import pytest
+
+from extensions import db
+from models import Menu
+
+
+@pytest.mark.parametrize("keyword", ["", "   "])
+def test_empty_keyword_lists_every_menu_in_stock(app, client, menu_ids, keyword):
+    with app.app_context():
+        db.session.get(Menu, menu_ids[0]).stock = 0
+        db.session.commit()
+    response = client.get("/menu/search", query_string={"keyword": keyword})
+    assert response.status_code == 200
+    assert [menu["id"] for menu in response.json["data"]["results"]] == menu_ids[1:]
+
+
+def test_keyword_ranks_matching_menus(client, menu_ids):
+    response = client.get("/menu/search", query_string={"keyword": "menu 7"})
+    assert response.json["data"]["results"][0]["name"] == "Menu 7"
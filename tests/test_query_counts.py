@@ -0,0 +1,44 @@
+import pytest
+
+from conftest import ADMIN_EMAIL, MEMBER_EMAIL, basic
+
+pytestmark = pytest.mark.usefixtures("users")
+
+
+def checkout(client, menu_ids):
+    response = client.post(
+        "/order/create",
+        json={
+            "order_items": [{"menu_id": m_id, "quantity": 1} for m_id in menu_ids],
+            "user_data": {"email": MEMBER_EMAIL},
+        },
+    )
+    assert response.status_code == 201, response.json
+    return response.json["data"]["order_id"]
+
+
+def get(client, path, email):
+    response = client.get(path, headers=basic(email))
+    assert response.status_code == 200, response.json
+
+
+def test_checkout_statements_do_not_grow_with_the_cart(client, menu_ids, count_statements):
+    counts = [
+        count_statements(lambda: checkout(client, menu_ids[:size]))
+        for size in (1, 10, 20)
+    ]
+    assert counts == [counts[0]] * 3
+
+
+# login, orders, their items in one batch (and the queue position of the
+# order), however many orders and items there are
+@pytest.mark.parametrize("orders", [1, 5])
+def test_order_queue_and_details_statements_are_pinned(
+    client, menu_ids, count_statements, orders
+):
+    order_ids = [checkout(client, menu_ids) for _ in range(orders)]
+    queue = count_statements(lambda: get(client, "/orders/created", ADMIN_EMAIL))
+    details = count_statements(
+        lambda: get(client, f"/order/details/{order_ids[-1]}", MEMBER_EMAIL)
+    )
+    assert (queue, details) == (3, 4)
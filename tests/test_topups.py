@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import ADMIN_EMAIL, MEMBER_EMAIL, basic
+from extensions import db
+from models import Balance_Record, User
+
+pytestmark = pytest.mark.usefixtures("users")
+
+
+# ids of two pending top-ups of the member
+@pytest.fixture
+def topup_ids(app):
+    with app.app_context():
+        member = User.query.filter_by(email=MEMBER_EMAIL).one()
+        records = [
+            Balance_Record(
+                user_id=member.id,
+                member_name=member.name,
+                nominal=10000,
+                created_date=datetime.now(),
+                status="created",
+                type="topup",
+            )
+            for _ in range(2)
+        ]
+        db.session.add_all(records)
+        db.session.commit()
+        return [record.id for record in records]
+
+
+def test_approve_one(client, topup_ids):
+    path = f"/balance/topup/{topup_ids[0]}"
+    assert client.put(path, headers=basic(ADMIN_EMAIL)).status_code == 200
+    response = client.put(path, headers=basic(ADMIN_EMAIL))
+    assert (response.status_code, response.json["message"]) == (
+        400,
+        "Top-up already completed",
+    )
+
+
+def test_approve_one_unknown_record(client, topup_ids):
+    response = client.put("/balance/topup/999", headers=basic(ADMIN_EMAIL))
+    assert (response.status_code, response.json["message"]) == (404, "Data not found")
+
+
+@pytest.mark.parametrize(
+    "body", [[1, 2], "x", {"record_ids": [True]}, {"record_ids": [0]}, {"filter": {}}]
+)
+def test_approve_many_rejects(client, topup_ids, body):
+    response = client.put("/balance/topup", headers=basic(ADMIN_EMAIL), json=body)
+    assert response.status_code == 400
+    statuses = client.get("/balance/topup", headers=basic(ADMIN_EMAIL)).json
+    assert len(statuses["data"]["requests"]) == 2
+
+
+def test_approve_many(client, topup_ids):
+    response = client.put(
+        "/balance/topup",
+        headers=basic(ADMIN_EMAIL),
+        json={"record_ids": [*topup_ids, 999]},
+    )
+    assert response.status_code == 200
+    outcomes = {r["record_id"]: r["status"] for r in response.json["data"]["results"]}
+    assert outcomes == {topup_ids[0]: "approved", topup_ids[1]: "approved", 999: "not found"}
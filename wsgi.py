@@ -0,0 +1,4 @@
+# the app of the servers (gunicorn wsgi:app) and of the flask command
+from app import create_app
+
+app = create_app()